@@ -1,61 +1,89 @@
-import os
-import logging
-from flask import Flask, render_template
+from flask import Flask, render_template, session
 from dotenv import load_dotenv
 
+# Avant l'import de la config : ses valeurs sont lues à la définition des classes
+load_dotenv()
+
+from sqlalchemy import text
 from routes import create_routes
-from routes.extensions import db, bcrypt
+from routes.extensions import db, bcrypt, hub, identity_cache, password_hasher, outbox, avatars, user_sessions, metrics, assets, compressor, attachments, audit, rate_limiter, fragment_cache
+from routes.passwords import HasherBusy
 from routes.config import ProdConfig
+from routes.database import configure_engines
+from routes.logs import configure_logging
 
 from flask_login import LoginManager
-from routes.models import User
-
-load_dotenv()
-
-app = Flask(__name__)
-app.config.from_object(ProdConfig)
 
-db.init_app(app)
-bcrypt.init_app(app)
-
-logging.basicConfig(
-    filename='logs/app.log',
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-
-app.logger.info("Flask a démarré")
-
-with app.app_context():
-    db.create_all()
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'
 
-create_routes(app)
+@login_manager.user_loader
+def load_user(user_id):
+    # Session révoquée ou expirée : l'utilisateur redevient anonyme
+    if not user_sessions.is_valid(session.get('session_token'), int(user_id)):
+        return None
+    return identity_cache.load(int(user_id))
 
-@app.route('/')
 def home():
     return render_template('index.html')
-@app.route('/testcontact')
+
 def test_contact_page():
     return render_template('contact.html')
 
-login_manager = LoginManager()
-login_manager.login_view = 'auth.login'
-login_manager.init_app(app)
-
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-@app.errorhandler(404)
 def not_found(e):
     return render_template("error.html", message="Page non trouvée"), 404
 
-@app.errorhandler(500)
+def hasher_busy(e):
+    return render_template("error.html", message="Serveur occupé, réessayez dans un instant"), 503
+
 def server_error(e):
     return render_template("error.html", message="Erreur serveur"), 500
 
-application = app
+def warmup(app):
+    # Passenger lance chaque worker Python directement (pas de fork après chargement) :
+    # compiler les templates et ouvrir la connexion ici profite à la première requête
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+    with app.app_context():
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+def create_app(config=ProdConfig):
+    # Aucun accès au schéma ici : create_all et les migrations passent par migrate.py
+    app = Flask(__name__)
+    app.config.from_object(config)
+    configure_engines(app)
+    configure_logging(app)
+
+    db.init_app(app)
+    bcrypt.init_app(app)
+    hub.init_app(app)
+    identity_cache.init_app(app)
+    password_hasher.init_app(app)
+    outbox.init_app(app)
+    avatars.init_app(app)
+    user_sessions.init_app(app)
+    metrics.init_app(app)
+    assets.init_app(app)
+    compressor.init_app(app)
+    attachments.init_app(app)
+    audit.init_app(app)
+    rate_limiter.init_app(app)
+    fragment_cache.init_app(app)
+    login_manager.init_app(app)
+
+    create_routes(app)
+    app.add_url_rule('/', 'home', home)
+    app.add_url_rule('/testcontact', 'test_contact_page', test_contact_page)
+    app.register_error_handler(404, not_found)
+    app.register_error_handler(HasherBusy, hasher_busy)
+    app.register_error_handler(500, server_error)
+
+    if app.config.get('WARMUP'):
+        warmup(app)
+
+    app.logger.info("Flask a démarré")
+    return app
 
 if __name__ == '__main__':
-    app.run()
+    create_app().run()
@@ -0,0 +1,30 @@
+# backfill_avatars.py
+# Génère les variantes des photos de profil envoyées avant le pipeline d'images
+import os
+
+from app import create_app
+from routes.extensions import db, avatars
+from routes.images import InvalidImage, VARIANT_PATTERN
+from routes.models import User
+
+app = create_app()
+
+with app.app_context():
+    users = User.query.filter(User.profile_picture_url.isnot(None)).all()
+    for user in users:
+        url = user.profile_picture_url
+        if VARIANT_PATTERN.match(url):
+            continue
+        path = os.path.join(app.root_path, url.lstrip('/'))
+        if not os.path.exists(path):
+            print(f"⚠️ {user.username} : fichier introuvable ({url})")
+            continue
+        try:
+            with open(path, 'rb') as stream:
+                user.profile_picture_url = avatars.process(stream)
+        except InvalidImage as e:
+            print(f"❌ {user.username} : {e}")
+            continue
+        db.session.commit()
+        avatars.discard(url)
+        print(f"✅ {user.username} : {url} → {user.profile_picture_url}")
@@ -0,0 +1,67 @@
+# benchmarks/password_hashing.py
+# Débit de connexion (vérification bcrypt) selon le coût et le nombre de places.
+# Usage : python -m benchmarks.password_hashing --rounds 10 12 --slots 1 2 4
+import argparse
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+from routes.extensions import bcrypt
+from routes.passwords import PasswordHasher, HasherBusy
+
+
+def run(rounds, slots, timeout, clients, logins):
+    app = Flask(__name__)
+    app.config.update(
+        BCRYPT_LOG_ROUNDS=rounds,
+        PASSWORD_HASH_SLOTS=slots,
+        PASSWORD_HASH_TIMEOUT=timeout,
+        PASSWORD_HASH_LOCK_DIR=tempfile.mkdtemp(prefix='bcrypt-slots-'),
+    )
+    bcrypt.init_app(app)
+    hasher = PasswordHasher(app)
+    password_hash = hasher.hash('motdepasse')
+
+    latencies = []
+    rejected = 0
+
+    def login(_):
+        nonlocal rejected
+        start = time.perf_counter()
+        try:
+            hasher.verify(password_hash, 'motdepasse')
+        except HasherBusy:
+            rejected += 1
+            return
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(
+        f"coût={rounds:<3} places={slots:<3} attente={timeout:<4} "
+        f"{len(latencies) / elapsed:8.1f} connexions/s  "
+        f"p50={statistics.median(latencies) * 1000 if latencies else 0:7.1f} ms  "
+        f"p95={p95 * 1000:7.1f} ms  refusées={rejected}"
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 12])
+    parser.add_argument('--slots', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--timeout', type=float, default=5)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=64)
+    args = parser.parse_args()
+
+    for rounds in args.rounds:
+        for slots in args.slots:
+            run(rounds, slots, args.timeout, args.clients, args.logins)
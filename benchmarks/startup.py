@@ -0,0 +1,62 @@
+# benchmarks/startup.py
+# Temps de démarrage d'un worker à froid : import, create_app et première requête.
+# Chaque essai tourne dans un nouvel interpréteur, comme un spawn Passenger.
+# Usage : python -m benchmarks.startup --trials 5 --path /login
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get(sys.argv[1])
+done = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'create_app': created - imported,
+    'first_request': done - created,
+    'status': response.status_code,
+}))
+"""
+
+
+def trial(path, warmup):
+    env = dict(os.environ, WARMUP='1' if warmup else '0')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, path],
+        cwd=root, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(path, trials, warmup):
+    results = [trial(path, warmup) for _ in range(trials)]
+    medians = {
+        key: statistics.median(r[key] for r in results) * 1000
+        for key in ('import', 'create_app', 'first_request')
+    }
+    print(
+        f"warmup={'oui' if warmup else 'non':<4} "
+        f"import={medians['import']:7.1f} ms  "
+        f"create_app={medians['create_app']:7.1f} ms  "
+        f"1re requête={medians['first_request']:7.1f} ms  "
+        f"total={sum(medians.values()):7.1f} ms  (HTTP {results[-1]['status']})"
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--path', default='/login')
+    args = parser.parse_args()
+
+    for warmup in (False, True):
+        run(args.path, args.trials, warmup)
@@ -0,0 +1,162 @@
+# benchmarks/suite.py
+# Scénarios HTTP via le client de test Flask sur une base remplie par seed_data.py.
+# Usage : python -m benchmarks.suite --iterations 200 --save-baseline benchmarks/baseline.json
+#         python -m benchmarks.suite --baseline benchmarks/baseline.json --tolerance 0.2
+# Code de sortie 1 si un p95 ou le nombre de requêtes SQL régresse par rapport à la référence.
+import argparse
+import json
+import sys
+import time
+
+from app import create_app
+from routes.extensions import db
+from routes.models import User, GroupMembership, Discussion, Message, MindMap
+from routes.querycount import count_queries
+from seed_data import PASSWORD
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(p / 100 * len(values)) - 1))
+    return values[index]
+
+
+def pick_fixtures(prefix):
+    # Discussion la plus active, son administrateur et un chef de projet doté d'une carte mentale
+    busiest = db.session.query(Message.discussion_id, db.func.count(Message.id).label('n')) \
+        .group_by(Message.discussion_id).order_by(db.text('n DESC')).first()
+    discussion = db.session.get(Discussion, busiest.discussion_id)
+    mind_map = MindMap.query.order_by(MindMap.id).first()
+    chef = db.session.query(User.username).join(GroupMembership, GroupMembership.user_id == User.id) \
+        .filter(GroupMembership.group_id == mind_map.group_id, GroupMembership.role_in_group == 'chef') \
+        .order_by(User.id).first()
+    admin = db.session.get(User, discussion.admin_id)
+    return {
+        'admin': admin.username,
+        'chef': chef.username if chef else f"{prefix}_admin",
+        'discussion_id': discussion.id,
+        'project_id': discussion.group_id,
+        'mind_map_project_id': mind_map.group_id,
+        'mind_map_revision': mind_map.revision,
+        'mind_map_root': (json.loads(mind_map.data or '{}').get('nodeData') or {'id': 'root'}),
+    }
+
+
+def scenarios(app, fixtures):
+    def client_for(username):
+        client = app.test_client()
+        client.post('/login', data={'username': username, 'password': PASSWORD})
+        return client
+
+    admin = client_for(fixtures['admin'])
+    chef = client_for(fixtures['chef'])
+    anonymous = app.test_client()
+    counter = iter(range(10 ** 9))
+    mind_map = {'revision': fixtures['mind_map_revision']}
+
+    def patch_mind_map():
+        # Même chemin que l'éditeur : une opération sur la racine, révision reprise de la réponse
+        root = {k: v for k, v in fixtures['mind_map_root'].items() if k != 'children'}
+        response = chef.post(f"/dashboard/project/{fixtures['mind_map_project_id']}/mind-map/patch", json={
+            'revision': mind_map['revision'],
+            'ops': [dict(root, op='update', topic=f"{root.get('topic') or 'Benchmark'} {next(counter)}")],
+        })
+        mind_map['revision'] = (response.get_json(silent=True) or {}).get('revision', mind_map['revision'])
+        return response
+
+    return {
+        'login': lambda: anonymous.post('/login', data={'username': fixtures['admin'], 'password': PASSWORD}),
+        'projects': lambda: admin.get('/dashboard/projects'),
+        'project_view': lambda: admin.get(f"/dashboard/project/{fixtures['project_id']}"),
+        'get_messages': lambda: admin.get(f"/dashboard/get-messages/{fixtures['discussion_id']}"),
+        'send_message': lambda: admin.post('/dashboard/send-message', json={
+            'discussion_id': fixtures['discussion_id'], 'content': f"Benchmark {next(counter)}"}),
+        'patch_mind_map': patch_mind_map,
+    }
+
+
+def run(name, request, iterations, warmup):
+    for _ in range(warmup):
+        request()
+    latencies, queries, errors = [], [], 0
+    for _ in range(iterations):
+        with count_queries(db.engine) as counter:
+            start = time.perf_counter()
+            response = request()
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+        if response.status_code >= 400:
+            errors += 1
+    return {
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'queries': sum(queries) / len(queries),
+        'errors': errors,
+    }
+
+
+def compare(results, baseline, tolerance, min_delta):
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        # Écart relatif ET absolu : quelques dixièmes de ms relèvent du bruit
+        slower = result['p95'] - reference['p95']
+        if result['p95'] > reference['p95'] * (1 + tolerance) and slower > min_delta:
+            regressions.append(f"{name} : p95 {reference['p95']:.1f} → {result['p95']:.1f} ms")
+        if result['queries'] > reference['queries']:
+            regressions.append(f"{name} : requêtes SQL {reference['queries']:.1f} → {result['queries']:.1f}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', nargs='+')
+    parser.add_argument('--prefix', default='seed')
+    parser.add_argument('--baseline')
+    parser.add_argument('--save-baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--min-delta', type=float, default=2.0, help='écart p95 minimal en ms')
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    # Le scénario login enchaîne les connexions depuis la même IP
+    app.config['RATELIMIT_ENABLED'] = False
+
+    with app.app_context():
+        fixtures = pick_fixtures(args.prefix)
+        baseline = {}
+        if args.baseline:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+
+        results = {}
+        for name, request in scenarios(app, fixtures).items():
+            if args.only and name not in args.only:
+                continue
+            # La connexion est volontairement coûteuse (bcrypt) : moins d'itérations
+            iterations = max(1, args.iterations // 10) if name == 'login' else args.iterations
+            result = results[name] = run(name, request, iterations, args.warmup)
+            reference = baseline.get(name)
+            delta = f"  (p95 {(result['p95'] / reference['p95'] - 1) * 100:+.0f} %)" if reference else ''
+            print(
+                f"{name:<14} p50={result['p50']:7.1f} ms  p95={result['p95']:7.1f} ms  "
+                f"p99={result['p99']:7.1f} ms  SQL/req={result['queries']:5.1f}  erreurs={result['errors']}{delta}"
+            )
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Référence enregistrée dans {args.save_baseline}")
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    for line in regressions:
+        print(f"❌ Régression {line}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,148 @@
+# build_assets.py
+# Étape de déploiement : empreinte des CSS/JS de static/ dans static/dist + manifest.json.
+# Usage : python build_assets.py [--vendor [--update-lock]]   (--vendor télécharge d'abord les bibliothèques tierces)
+# Les bibliothèques sont comparées à leur sha256 dans vendor.lock.json ; --update-lock enregistre
+# les empreintes des URL nouvelles ou modifiées, après vérification manuelle des fichiers.
+# Écrit aussi les variantes .gz (et .br si le module brotli est installé) servies telles quelles.
+# Redémarrer ensuite les workers (tmp/restart.txt) pour qu'ils relisent le manifest.
+import argparse
+import hashlib
+import json
+import os
+import re
+import urllib.request
+
+from routes.assets import VENDOR, VENDOR_LOCK, load_manifest, load_vendor_lock
+from routes.compression import brotli, compress
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC = os.path.join(ROOT, 'static')
+DIST = os.path.join(STATIC, 'dist')
+SOURCES = ('css', 'js', 'vendor')
+EXTENSIONS = ('.css', '.js')
+# Google Fonts ne sert du woff2 qu'aux navigateurs récents
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+# Formats déjà compressés (woff2, images matricielles) exclus
+PRECOMPRESS = ('.css', '.js', '.svg', '.json', '.txt', '.ttf', '.html')
+FONT_URL = re.compile(r'url\((https://fonts\.gstatic\.com/[^)]+)\)')
+
+
+def download(url):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def verify(name, url, data, lock, update_lock):
+    # Empreinte liée à l'URL : changer de version impose de réenregistrer le fichier
+    digest = hashlib.sha256(data).hexdigest()
+    entry = lock.get(name)
+    if entry is None or entry['url'] != url:
+        if not update_lock:
+            raise SystemExit(f"❌ {name} : aucune empreinte pour {url} dans vendor.lock.json (--update-lock)")
+        lock[name] = {'url': url, 'sha256': digest}
+    elif entry['sha256'] != digest:
+        raise SystemExit(f"❌ {name} : sha256 {digest} au lieu de {entry['sha256']}, fichier refusé")
+
+
+def vendor(update_lock=False):
+    # Tout est téléchargé et vérifié avant d'écrire : un fichier refusé ne laisse pas static/vendor à moitié à jour
+    lock = load_vendor_lock(ROOT)
+    files = {}
+    for name, url in VENDOR.items():
+        data = download(url)
+        # Feuille Google Fonts vérifiée telle que servie à USER_AGENT, avant réécriture
+        verify(name, url, data, lock, update_lock)
+        if name.startswith('vendor/fonts/'):
+            # Les fichiers de police sont rapatriés et la feuille réécrite vers /static/vendor/fonts
+            css = data.decode('utf-8')
+            for font_url in sorted(set(FONT_URL.findall(css))):
+                parts = font_url.split('/')
+                font_name = f"vendor/fonts/{'-'.join(parts[-3:])}"
+                font = download(font_url)
+                verify(font_name, font_url, font, lock, update_lock)
+                files[font_name] = font
+                css = css.replace(font_url, f'/static/{font_name}')
+            data = css.encode('utf-8')
+        files[name] = data
+        print(f"⬇️  {name} ← {url} (sha256 {hashlib.sha256(data).hexdigest()[:12]})")
+
+    for name, data in files.items():
+        write(os.path.join(STATIC, name), data)
+    if update_lock:
+        with open(os.path.join(ROOT, VENDOR_LOCK), 'w', encoding='utf-8') as f:
+            json.dump(lock, f, indent=2, sort_keys=True)
+
+
+def fingerprint():
+    previous = load_manifest(STATIC)
+    manifest = {}
+    for source in SOURCES:
+        for folder, _, files in os.walk(os.path.join(STATIC, source)):
+            for filename in sorted(files):
+                stem, ext = os.path.splitext(filename)
+                if ext not in EXTENSIONS:
+                    continue
+                path = os.path.join(folder, filename)
+                rel = os.path.relpath(path, STATIC).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()[:10]
+                target = f"dist/{os.path.dirname(rel)}/{stem}.{digest}{ext}"
+                write(os.path.join(STATIC, target), data)
+                manifest[rel] = target
+
+    # On garde la génération précédente : des pages déjà servies peuvent encore la référencer
+    keep = set(manifest.values()) | set(previous.values()) | {'dist/manifest.json'}
+    for folder, _, files in os.walk(DIST):
+        for filename in files:
+            path = os.path.join(folder, filename)
+            rel = os.path.relpath(path, STATIC).replace(os.sep, '/')
+            if re.sub(r'\.(gz|br)$', '', rel) not in keep:
+                os.remove(path)
+
+    with open(os.path.join(DIST, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"✅ {len(manifest)} fichiers empreintés dans static/dist")
+
+
+def precompress():
+    written = 0
+    encodings = [('gzip', '.gz')] + ([('br', '.br')] if brotli else [])
+    for folder, _, files in os.walk(STATIC):
+        for filename in files:
+            if not filename.endswith(PRECOMPRESS):
+                continue
+            path = os.path.join(folder, filename)
+            with open(path, 'rb') as f:
+                data = f.read()
+            for encoding, suffix in encodings:
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                compressed = compress(data, encoding, gzip_level=9, brotli_quality=11)
+                # Inutile de servir une variante qui ne fait pas gagner au moins 5 %
+                if len(compressed) < len(data) * 0.95:
+                    write(target, compressed)
+                    written += 1
+                elif os.path.exists(target):
+                    os.remove(target)
+    print(f"✅ {written} variantes compressées écrites{'' if brotli else ' (gzip seul : module brotli absent)'}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--vendor', action='store_true')
+    parser.add_argument('--update-lock', action='store_true')
+    args = parser.parse_args()
+
+    if args.vendor:
+        vendor(args.update_lock)
+    fingerprint()
+    precompress()
@@ -0,0 +1,10 @@
+# flush_outbox.py
+# Envoie les e-mails en attente de la table outbound_emails ; à planifier en cron (ex. toutes les minutes)
+from app import create_app
+from routes.extensions import outbox
+
+app = create_app()
+
+with app.app_context():
+    sent = outbox.drain()
+    print(f"📨 E-mails traités : {sent}")
@@ -0,0 +1,15 @@
+# migrate.py
+# Étape de déploiement séparée : à lancer avant de toucher tmp/restart.txt
+from app import create_app
+from routes.extensions import db
+import migrations
+
+app = create_app()
+
+with app.app_context():
+    db.create_all()
+    done = migrations.upgrade(db.engine)
+    if done:
+        print(f"✅ Migrations appliquées : {', '.join(done)}")
+    else:
+        print("ℹ️ Schéma déjà à jour.")
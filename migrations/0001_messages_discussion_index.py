@@ -0,0 +1,6 @@
+# Index composite pour la pagination par curseur de l'historique des messages
+from migrations import create_index
+
+
+def upgrade(conn):
+    create_index(conn, 'messages', 'ix_messages_discussion_id_id', ['discussion_id', 'id'])
@@ -0,0 +1,12 @@
+# Révisions des cartes mentales et colonnes de normalisation des nœuds
+from migrations import add_column, create_index
+
+
+def upgrade(conn):
+    add_column(conn, 'mind_maps', 'revision', "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, 'mind_maps', 'snapshot_revision', "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, 'mind_map_node', 'node_key', "VARCHAR(64) NOT NULL DEFAULT ''")
+    add_column(conn, 'mind_map_node', 'sort_order', "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, 'mind_map_node', 'extra', "TEXT")
+    create_index(conn, 'mind_map_node', 'uq_mind_map_node_key', ['mind_map_id', 'node_key'], unique=True)
+    create_index(conn, 'mind_map_node', 'ix_mind_map_node_parent_id', ['parent_id'])
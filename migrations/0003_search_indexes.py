@@ -0,0 +1,6 @@
+# Index plein texte des membres et des projets (FTS5 / FULLTEXT)
+from routes.search import create_search_indexes
+
+
+def upgrade(conn):
+    create_search_indexes(conn)
@@ -0,0 +1,7 @@
+# Index pour la déconnexion (user_id) et la purge des sessions expirées (expires_at)
+from migrations import create_index
+
+
+def upgrade(conn):
+    create_index(conn, 'user_sessions', 'ix_user_sessions_user_id', ['user_id'])
+    create_index(conn, 'user_sessions', 'ix_user_sessions_expires_at', ['expires_at'])
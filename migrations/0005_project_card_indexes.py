@@ -0,0 +1,8 @@
+# Index des agrégats de la liste des projets : membres par projet, projets d'un utilisateur, dernier message
+from migrations import create_index
+
+
+def upgrade(conn):
+    create_index(conn, 'group_memberships', 'ix_group_memberships_group_id_user_id', ['group_id', 'user_id'])
+    create_index(conn, 'group_memberships', 'ix_group_memberships_user_id', ['user_id'])
+    create_index(conn, 'messages', 'ix_messages_group_id_sent_at', ['group_id', 'sent_at'])
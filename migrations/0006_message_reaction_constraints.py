@@ -0,0 +1,16 @@
+# Une réaction par (utilisateur, message, emoji) et index du regroupement par message
+from sqlalchemy import text
+
+from migrations import create_index
+
+
+def upgrade(conn):
+    # Doublons éventuels supprimés avant la contrainte (table dérivée exigée par MySQL)
+    conn.execute(text(
+        "DELETE FROM message_reactions WHERE id NOT IN ("
+        " SELECT id FROM (SELECT MIN(id) AS id FROM message_reactions"
+        " GROUP BY user_id, message_id, emoji) AS keep)"
+    ))
+    create_index(conn, 'message_reactions', 'uq_message_reactions_user_message_emoji',
+                 ['user_id', 'message_id', 'emoji'], unique=True)
+    create_index(conn, 'message_reactions', 'ix_message_reactions_message_id_emoji', ['message_id', 'emoji'])
@@ -0,0 +1,9 @@
+# Métadonnées des pièces jointes et index du chargement groupé par message
+from migrations import add_column, create_index
+
+
+def upgrade(conn):
+    add_column(conn, 'files', 'name', 'VARCHAR(255)')
+    add_column(conn, 'files', 'size', 'BIGINT')
+    add_column(conn, 'files', 'content_type', 'VARCHAR(100)')
+    create_index(conn, 'files', 'ix_files_message_id', ['message_id'])
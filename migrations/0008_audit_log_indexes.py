@@ -0,0 +1,8 @@
+# Index du journal d'audit : filtres par auteur, action ou période, tri par id décroissant
+from migrations import create_index
+
+
+def upgrade(conn):
+    create_index(conn, 'audit_logs', 'ix_audit_logs_user_id_id', ['user_id', 'id'])
+    create_index(conn, 'audit_logs', 'ix_audit_logs_action_id', ['action', 'id'])
+    create_index(conn, 'audit_logs', 'ix_audit_logs_created_at', ['created_at'])
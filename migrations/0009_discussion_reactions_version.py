@@ -0,0 +1,6 @@
+# Version des réactions par discussion : l'ETag des messages ne recompte plus les réactions
+from migrations import add_column
+
+
+def upgrade(conn):
+    add_column(conn, 'discussions', 'reactions_version', "INTEGER NOT NULL DEFAULT 0")
@@ -0,0 +1,13 @@
+# Nom de l'auteur figé sur chaque événement d'audit, renseigné pour l'historique existant
+from sqlalchemy import text
+
+from migrations import add_column, create_index
+
+
+def upgrade(conn):
+    add_column(conn, 'audit_logs', 'actor_name', "VARCHAR(50)")
+    conn.execute(text(
+        "UPDATE audit_logs SET actor_name = (SELECT username FROM users WHERE users.id = audit_logs.user_id)"
+        " WHERE actor_name IS NULL AND user_id IS NOT NULL"
+    ))
+    create_index(conn, 'audit_logs', 'ix_audit_logs_actor_name_id', ['actor_name', 'id'])
@@ -0,0 +1,58 @@
+# migrations/__init__.py
+import importlib
+import os
+import re
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+VERSION_PATTERN = re.compile(r'^(\d{4})_\w+\.py$')
+
+
+def available_migrations():
+    folder = os.path.dirname(__file__)
+    names = sorted(n for n in os.listdir(folder) if VERSION_PATTERN.match(n))
+    return [
+        (name[:4], importlib.import_module(f"{__name__}.{name[:-3]}"))
+        for name in names
+    ]
+
+
+def applied_versions(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version VARCHAR(16) PRIMARY KEY,"
+            " applied_at DATETIME NOT NULL)"
+        ))
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def upgrade(engine):
+    applied = applied_versions(engine)
+    done = []
+    for version, module in available_migrations():
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, applied_at) VALUES (:v, :at)"),
+                {"v": version, "at": datetime.utcnow()}
+            )
+        done.append(version)
+    return done
+
+
+def create_index(conn, table, name, columns, unique=False):
+    existing = {i['name'] for i in inspect(conn).get_indexes(table)}
+    if name in existing:
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
+
+
+def add_column(conn, table, name, definition):
+    existing = {c['name'] for c in inspect(conn).get_columns(table)}
+    if name not in existing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
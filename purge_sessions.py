@@ -0,0 +1,10 @@
+# purge_sessions.py
+# Supprime les sessions expirées par lots ; à planifier en cron (ex. toutes les heures)
+from app import create_app
+from routes.extensions import user_sessions
+
+app = create_app()
+
+with app.app_context():
+    purged = user_sessions.purge_expired()
+    print(f"🧹 Sessions expirées supprimées : {purged}")
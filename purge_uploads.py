@@ -0,0 +1,12 @@
+# purge_uploads.py
+# Supprime les envois de pièces jointes abandonnés et les fichiers qu'aucun message n'utilise ; à planifier en cron (ex. une fois par jour)
+from app import create_app
+from routes.extensions import attachments
+
+app = create_app()
+
+with app.app_context():
+    purged = attachments.purge_stale()
+    print(f"🧹 Envois abandonnés supprimés : {purged}")
+    orphans = attachments.purge_orphans()
+    print(f"🧹 Fichiers orphelins supprimés : {orphans}")
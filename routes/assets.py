@@ -0,0 +1,92 @@
+# routes/assets.py
+import base64
+import json
+import os
+import re
+
+from flask import request, url_for
+from markupsafe import Markup
+
+# Bibliothèques tierces copiées dans static/vendor par build_assets.py --vendor ;
+# tant qu'elles ne sont pas construites, l'URL d'origine sert de repli.
+# Versions exactes : build_assets.py vérifie le sha256 de chaque fichier (vendor.lock.json),
+# polices comprises ; le repli CDN porte le même hash en attribut integrity (SRI)
+VENDOR_LOCK = 'vendor.lock.json'
+VENDOR = {
+    'vendor/feather.min.js': 'https://unpkg.com/feather-icons@4.29.2/dist/feather.min.js',
+    'vendor/quill.min.js': 'https://cdn.quilljs.com/1.3.6/quill.min.js',
+    'vendor/quill.snow.css': 'https://cdn.quilljs.com/1.3.6/quill.snow.css',
+    'vendor/polyfill.min.js': 'https://cdn.jsdelivr.net/npm/@babel/polyfill@7.12.1/dist/polyfill.min.js',
+    'vendor/mind-elixir.min.js': 'https://cdn.jsdelivr.net/npm/mind-elixir@4.0.0/dist/mind-elixir.min.js',
+    'vendor/mind-elixir.min.css': 'https://cdn.jsdelivr.net/npm/mind-elixir@4.0.0/dist/mind-elixir.min.css',
+    'vendor/fonts/inter.css': 'https://fonts.googleapis.com/css2?family=Inter:wght@400;600&display=swap',
+    'vendor/fonts/poppins.css': 'https://fonts.googleapis.com/css2?family=Poppins:wght@300;500;700&display=swap',
+}
+
+# Noms qui changent avec le contenu : cache navigateur d'un an sans revalidation
+IMMUTABLE_PATTERN = re.compile(r'^(dist/|vendor/fonts/.+\.woff2$|images/user_image/[0-9a-f]{16}_\d+\.(jpg|webp)$)')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class AssetManifest:
+    # Résout les noms de static/ vers leur version empreinte (static/dist/manifest.json)
+    def __init__(self, app=None):
+        self.manifest = {}
+        self.lock = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.manifest = load_manifest(app.static_folder)
+        self.lock = load_vendor_lock(app.root_path)
+        app.add_template_global(self.url, 'asset_url')
+        app.add_template_global(self.integrity, 'asset_integrity')
+        app.url_defaults(self._fingerprint)
+        app.after_request(self._cache_headers)
+        app.extensions['assets'] = self
+
+    def url(self, filename):
+        if filename not in self.manifest and filename in VENDOR:
+            return VENDOR[filename]
+        return url_for('static', filename=filename)
+
+    def integrity(self, filename):
+        # Seulement pour le repli CDN : le navigateur refuse un fichier différent de celui verrouillé.
+        # Les feuilles Google Fonts varient selon le navigateur, elles n'ont pas de repli vérifiable
+        entry = self.lock.get(filename)
+        if filename in self.manifest or filename.startswith('vendor/fonts/') or entry is None \
+                or entry['url'] != VENDOR.get(filename):
+            return ''
+        digest = base64.b64encode(bytes.fromhex(entry['sha256'])).decode()
+        return Markup(f' integrity="sha256-{digest}" crossorigin="anonymous"')
+
+    def _fingerprint(self, endpoint, values):
+        # url_for('static', filename='css/x.css') renvoie aussi le nom empreinte
+        if endpoint == 'static' and values.get('filename') in self.manifest:
+            values['filename'] = self.manifest[values['filename']]
+
+    def _cache_headers(self, response):
+        if request.endpoint == 'static' and response.status_code in (200, 304):
+            if IMMUTABLE_PATTERN.match((request.view_args or {}).get('filename', '')):
+                response.cache_control.no_cache = None
+                response.cache_control.public = True
+                response.cache_control.max_age = IMMUTABLE_MAX_AGE
+                response.cache_control.immutable = True
+        return response
+
+
+def load_vendor_lock(root):
+    # {nom: {"url": ..., "sha256": ...}}, écrit par build_assets.py --vendor --update-lock
+    try:
+        with open(os.path.join(root, VENDOR_LOCK), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def load_manifest(static_folder):
+    path = os.path.join(static_folder, 'dist', 'manifest.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
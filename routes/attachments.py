@@ -0,0 +1,273 @@
+# routes/attachments.py
+import fcntl
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from flask import current_app, send_file, Response
+from werkzeug.utils import secure_filename
+
+BLOCK_SIZE = 64 * 1024
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class AttachmentStore:
+    # Fichiers nommés par leur sha256 : un contenu envoyé deux fois n'est stocké qu'une fois
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['attachments'] = self
+
+    @property
+    def root(self):
+        return os.path.join(current_app.root_path, current_app.config['ATTACHMENT_FOLDER'])
+
+    def blob_key(self, digest):
+        return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+    def blob_path(self, key):
+        return os.path.join(self.root, 'blobs', *key.split('/'))
+
+    def _upload_path(self, upload_id, ext):
+        if not UPLOAD_ID_PATTERN.match(upload_id or ''):
+            raise UploadError("Envoi inconnu.", 404)
+        return os.path.join(self.root, 'uploads', f"{upload_id}.{ext}")
+
+    @contextmanager
+    def _locked(self, upload_id):
+        # Verrou exclusif par envoi (flock, partagé entre workers) : un morceau renvoyé en double
+        # ou une reprise concurrente ne vérifie et n'écrit pas en même temps qu'un autre
+        try:
+            fd = os.open(self._upload_path(upload_id, 'lock'), os.O_RDWR)
+        except FileNotFoundError:
+            raise UploadError("Envoi inconnu.", 404)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _save(self, upload_id, meta):
+        path = self._upload_path(upload_id, 'json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(path + '.tmp', path)
+
+    def load(self, upload_id, user_id):
+        try:
+            with open(self._upload_path(upload_id, 'json')) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            raise UploadError("Envoi inconnu.", 404)
+        if meta['user_id'] != user_id:
+            raise UploadError("Envoi inconnu.", 404)
+        return meta
+
+    def offset(self, upload_id, meta):
+        if meta.get('key'):
+            return meta['size']
+        try:
+            return os.path.getsize(self._upload_path(upload_id, 'part'))
+        except FileNotFoundError:
+            raise UploadError("Envoi inconnu.", 404)
+
+    def pending_bytes(self, user_id):
+        # Envois en cours ou terminés mais pas encore rattachés à un message
+        folder = os.path.join(self.root, 'uploads')
+        total = 0
+        for name in os.listdir(folder) if os.path.isdir(folder) else ():
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(folder, name)) as f:
+                    meta = json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue
+            if meta['user_id'] == user_id:
+                total += meta['size']
+        return total
+
+    def start(self, user_id, discussion_id, name, size, content_type=None):
+        if size < 1:
+            raise UploadError("Fichier vide.")
+        if size > current_app.config['ATTACHMENT_MAX_BYTES']:
+            raise UploadError("Fichier trop volumineux.", 413)
+        if self.pending_bytes(user_id) + size > current_app.config['ATTACHMENT_PENDING_MAX_BYTES']:
+            raise UploadError("Trop d'envois en attente : envoyez ou abandonnez les fichiers en cours.", 413)
+
+        upload_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.root, 'uploads'), exist_ok=True)
+        open(self._upload_path(upload_id, 'part'), 'wb').close()
+        open(self._upload_path(upload_id, 'lock'), 'wb').close()
+        self._save(upload_id, {
+            'user_id': user_id,
+            'discussion_id': discussion_id,
+            'name': (name or 'fichier')[:255],
+            'size': size,
+            'content_type': (content_type or 'application/octet-stream')[:100],
+        })
+        return upload_id
+
+    def write_chunk(self, upload_id, user_id, start, total, length, stream):
+        # Écriture par blocs à la position annoncée : le morceau n'est jamais gardé en mémoire
+        with self._locked(upload_id):
+            meta = self.load(upload_id, user_id)
+            if meta.get('key'):
+                return meta
+            offset = self.offset(upload_id, meta)
+            if total != meta['size'] or start + length > meta['size']:
+                raise UploadError("Plage invalide.", 416, offset)
+            if start != offset:
+                raise UploadError("Position inattendue.", 409, offset)
+            if length > current_app.config['ATTACHMENT_CHUNK_SIZE']:
+                raise UploadError("Morceau trop volumineux.", 413, offset)
+
+            with open(self._upload_path(upload_id, 'part'), 'r+b') as f:
+                f.seek(start)
+                remaining = length
+                while remaining:
+                    block = stream.read(min(BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    f.write(block)
+                    remaining -= len(block)
+
+            # Connexion coupée : le client reprend à la taille réellement écrite
+            if self.offset(upload_id, meta) == meta['size']:
+                return self._finish(upload_id, meta)
+            return meta
+
+    def _finish(self, upload_id, meta):
+        # Appelé sous le verrou de l'envoi ; le fichier reste dans uploads/ jusqu'à claim,
+        # il est donc purgé avec l'envoi s'il n'est jamais rattaché à un message
+        digest = hashlib.sha256()
+        try:
+            with open(self._upload_path(upload_id, 'part'), 'rb') as f:
+                for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                    digest.update(block)
+        except FileNotFoundError:
+            raise UploadError("Envoi inconnu.", 404)
+
+        meta['key'] = self.blob_key(digest.hexdigest())
+        self._save(upload_id, meta)
+        return meta
+
+    def claim(self, upload_id, user_id, discussion_id):
+        # Juste avant le commit du message : le fichier passe dans blobs/
+        with self._locked(upload_id):
+            meta = self.load(upload_id, user_id)
+            if meta['discussion_id'] != discussion_id:
+                raise UploadError("Envoi inconnu.", 404)
+            if not meta.get('key'):
+                raise UploadError("Envoi incomplet.", 409, self.offset(upload_id, meta))
+
+            part = self._upload_path(upload_id, 'part')
+            path = self.blob_path(meta['key'])
+            if os.path.exists(path):
+                # Contenu déjà stocké : rafraîchir la date le protège de purge_orphans
+                os.utime(path)
+                if os.path.exists(part):
+                    os.remove(part)
+            elif os.path.exists(part):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(part, path)
+            else:
+                raise UploadError("Envoi inconnu.", 404)
+            return meta
+
+    def release(self, upload_id):
+        # Après le commit du message : le fichier reste dans blobs/
+        for ext in ('json', 'part', 'lock'):
+            try:
+                os.remove(self._upload_path(upload_id, ext))
+            except FileNotFoundError:
+                pass
+
+    def purge_stale(self, max_age=None):
+        # Envois abandonnés (jamais terminés ou jamais rattachés à un message) ; un envoi est
+        # supprimé en entier (.json, .part, .lock) d'après sa dernière écriture
+        max_age = max_age or current_app.config['ATTACHMENT_UPLOAD_TTL']
+        folder = os.path.join(self.root, 'uploads')
+        limit = time.time() - max_age
+        uploads = {}
+        for name in os.listdir(folder) if os.path.isdir(folder) else ():
+            try:
+                mtime = os.path.getmtime(os.path.join(folder, name))
+            except FileNotFoundError:
+                continue
+            upload = uploads.setdefault(name.split('.', 1)[0], {'mtime': 0, 'names': []})
+            upload['mtime'] = max(upload['mtime'], mtime)
+            upload['names'].append(name)
+
+        purged = 0
+        for upload in uploads.values():
+            if upload['mtime'] < limit:
+                for name in upload['names']:
+                    try:
+                        os.remove(os.path.join(folder, name))
+                    except FileNotFoundError:
+                        pass
+                purged += 1
+        return purged
+
+    def purge_orphans(self, max_age=None):
+        # Fichiers de blobs/ sans pièce jointe (commit du message annulé, message supprimé) ;
+        # le délai laisse le temps à un envoi en cours de valider son message
+        from .extensions import db
+        from .models import File
+
+        max_age = max_age or current_app.config['ATTACHMENT_UPLOAD_TTL']
+        folder = os.path.join(self.root, 'blobs')
+        limit = time.time() - max_age
+        used = set(db.session.scalars(db.select(File.file_url).distinct()))
+        purged = 0
+        for dirpath, _, names in os.walk(folder):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                if self.blob_key(name) not in used and os.path.getmtime(path) < limit:
+                    os.remove(path)
+                    purged += 1
+        return purged
+
+    def send(self, file):
+        # Range et 304 gérés par send_file ; sinon transfert délégué au serveur web frontal
+        mode = current_app.config['ATTACHMENT_SENDFILE']
+        path = self.blob_path(file.file_url)
+        if mode == 'x-accel-redirect':
+            response = Response(mimetype=file.content_type)
+            response.headers['X-Accel-Redirect'] = current_app.config['ATTACHMENT_ACCEL_PREFIX'] + file.file_url
+        elif mode == 'x-sendfile':
+            response = Response(mimetype=file.content_type)
+            response.headers['X-Sendfile'] = path
+        else:
+            response = send_file(
+                path,
+                mimetype=file.content_type,
+                as_attachment=True,
+                download_name=file.name,
+                etag=file.file_url.rsplit('/', 1)[-1],
+                max_age=0
+            )
+            response.cache_control.private = True
+            return response
+
+        fallback = secure_filename(file.name) or 'fichier'
+        response.headers['Content-Disposition'] = (
+            f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(file.name)}"
+        )
+        response.cache_control.private = True
+        return response
@@ -0,0 +1,152 @@
+# routes/audit.py
+import atexit
+import json
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import SQLAlchemyError
+
+# Actions enregistrées et libellés du journal d'administration
+ACTIONS = {
+    'auth.login': "Connexion",
+    'auth.login_failed': "Échec de connexion",
+    'auth.logout': "Déconnexion",
+    'account.delete': "Suppression de son compte",
+    'member.update': "Modification d'un membre",
+    'member.rank_change': "Changement de rang",
+    'member.delete': "Suppression d'un membre",
+    'group.add_member': "Ajout à un projet",
+    'group.remove_member': "Retrait d'un projet",
+    'group.demote_member': "Rétrogradation dans un projet",
+}
+
+
+class AuditTrail:
+    # Événements courants gardés en mémoire puis insérés par lots (INSERT multi-lignes),
+    # au seuil de taille ou d'âge ; les événements critiques partent dans la transaction de l'action
+    def __init__(self, app=None):
+        self.app = None
+        self._buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.teardown_request(self._teardown)
+        app.extensions['audit'] = self
+        atexit.register(self._flush_at_exit)
+
+    @property
+    def config(self):
+        return self.app.config
+
+    def record(self, action, user_id=None, details=None, critical=False, actor_name=None):
+        from .extensions import db
+        from .models import AuditLog, User
+
+        if actor_name is None and user_id is not None:
+            # Utilisateur déjà dans la session (current_user, compte qui se connecte) : pas de requête
+            user = db.session.get(User, user_id)
+            actor_name = user.username if user else None
+
+        row = {
+            'user_id': user_id,
+            'actor_name': actor_name,
+            'action': action,
+            'details': json.dumps(details, ensure_ascii=False) if details is not None else None,
+            'created_at': datetime.utcnow(),
+        }
+        if critical:
+            # Validé ou annulé avec l'action : aucun commit supplémentaire, aucune perte possible
+            db.session.add(AuditLog(**row))
+            return
+
+        with self._lock:
+            if len(self._buffer) >= self.config['AUDIT_BUFFER_MAX']:
+                self._buffer.pop(0)
+                self.app.logger.warning("Tampon d'audit plein : événement le plus ancien abandonné")
+            self._buffer.append(row)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+        self._ensure_thread()
+
+    def _due(self):
+        with self._lock:
+            if not self._buffer:
+                return False
+            return (len(self._buffer) >= self.config['AUDIT_BATCH_SIZE']
+                    or time.monotonic() - self._oldest >= self.config['AUDIT_FLUSH_INTERVAL'])
+
+    def _teardown(self, exc):
+        if self._due():
+            self.flush()
+
+    def _ensure_thread(self):
+        # Démarrage paresseux : Passenger fork les workers après l'import de l'app
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        # Un worker inactif vide quand même son tampon après AUDIT_FLUSH_INTERVAL
+        while True:
+            self._wakeup.wait(self.config['AUDIT_FLUSH_INTERVAL'])
+            self._wakeup.clear()
+            if self._due():
+                with self.app.app_context():
+                    self.flush()
+
+    def _flush_at_exit(self):
+        if self._buffer:
+            with self.app.app_context():
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._buffer, self._oldest = self._buffer, [], None
+        if not rows:
+            return 0
+
+        try:
+            self._insert(rows)
+        except SQLAlchemyError:
+            self.app.logger.exception("Écriture du journal d'audit impossible, %d événements remis en file", len(rows))
+            with self._lock:
+                self._buffer[:0] = rows
+                del self._buffer[:-self.config['AUDIT_BUFFER_MAX']]
+                self._oldest = time.monotonic()
+            return 0
+        return len(rows)
+
+    def _insert(self, rows):
+        from .extensions import db
+        from .models import AuditLog, User
+
+        # Connexion dédiée : indépendante de la session (et de la transaction) de la requête
+        with db.engine.begin() as conn:
+            # Auteur supprimé entre-temps par un autre worker : la clé étrangère refuserait le lot
+            user_ids = {row['user_id'] for row in rows if row['user_id'] is not None}
+            if user_ids:
+                existing = set(conn.execute(db.select(User.id).where(User.id.in_(user_ids))).scalars())
+                rows = [row if row['user_id'] in existing else dict(row, user_id=None) for row in rows]
+            size = self.config['AUDIT_BATCH_SIZE']
+            for i in range(0, len(rows), size):
+                conn.execute(AuditLog.__table__.insert().values(rows[i:i + size]))
+
+    def detach_user(self, user_id):
+        # Avant la suppression d'un compte : ON DELETE SET NULL côté application (les bases créées
+        # avant la contrainte ne l'ont pas) ; actor_name garde le nom de l'auteur
+        from .models import AuditLog
+
+        with self._lock:
+            for row in self._buffer:
+                if row['user_id'] == user_id:
+                    row['user_id'] = None
+        AuditLog.query.filter_by(user_id=user_id).update({'user_id': None}, synchronize_session=False)
@@ -1,11 +1,10 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, session
 from flask_login import login_user, logout_user, login_required, current_user
 import os
-from datetime import datetime, timedelta
-import secrets
+from datetime import datetime
 
-from routes.extensions import db, bcrypt
-from routes.models import User, UserSession
+from routes.extensions import db, password_hasher, identity_cache, user_sessions, audit, fragment_cache, rate_limiter
+from routes.models import User
 from . import auth_bp
 from .forms import LoginForm, RegisterForm
 from .utils import authenticate
@@ -14,7 +13,7 @@ from .utils import authenticate
 def register():
     form = RegisterForm()
     if form.validate_on_submit():
-        hashed_pw = bcrypt.generate_password_hash(form.password.data).decode('utf-8')
+        hashed_pw = password_hasher.hash(form.password.data)
         user = User(
             username=form.username.data,
             password_hash=hashed_pw,
@@ -37,30 +36,29 @@ def login():
         if user:
             login_user(user)
 
-            session_token = secrets.token_urlsafe(32)
-            user_session = UserSession(
-                user_id=user.id,
-                session_token=session_token,
-                ip_address=request.remote_addr,
-                created_at=datetime.utcnow(),
-                expires_at=datetime.utcnow() + timedelta(days=30)
-            )
-            db.session.add(user_session)
+            session['session_token'] = user_sessions.create(user.id, request.remote_addr)
 
             user.last_login_at = datetime.utcnow()
+            audit.record('auth.login', user.id, {'ip': request.remote_addr}, critical=True)
             db.session.commit()
+            identity_cache.invalidate(user.id)
+            fragment_cache.invalidate_user(user.id)
 
             flash('Connexion réussie ✅', 'success')
             return redirect(request.args.get('next') or url_for('dashboard.projects'))
         else:
+            audit.record('auth.login_failed', None, {'username': form.username.data, 'ip': request.remote_addr},
+                         critical=True)
+            db.session.commit()
+            rate_limiter.login_failed(form.username.data)
             flash('Identifiants invalides ❌', 'danger')
     return render_template('auth.html', form=form, title="Connexion")
 
 @auth_bp.route('/logout')
 @login_required
 def logout():
-    UserSession.query.filter_by(user_id=current_user.id).delete()
-    db.session.commit()
+    audit.record('auth.logout', current_user.id)
+    user_sessions.revoke(session.pop('session_token', None))
 
     logout_user()
     flash("Déconnexion réussie 👋", "info")
@@ -1,9 +1,12 @@
 from flask_login import login_user
-from routes.extensions import bcrypt
+from routes.extensions import password_hasher
 from routes.models import User
 
 def authenticate(username, password):
     user = User.query.filter_by(username=username).first()
-    if user and bcrypt.check_password_hash(user.password_hash, password):
+    if user and password_hasher.verify(user.password_hash, password):
+        # Coût bcrypt modifié dans la config : on rehache au passage (commit par l'appelant)
+        if password_hasher.needs_rehash(user.password_hash):
+            user.password_hash = password_hasher.hash(password)
         return user
     return None
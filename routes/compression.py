@@ -0,0 +1,99 @@
+# routes/compression.py
+import gzip
+import mimetypes
+import os
+
+from flask import request, send_from_directory
+from werkzeug.utils import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : gzip seul sinon
+    brotli = None
+
+COMPRESSIBLE = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+}
+# Extension du fichier précompressé par codage, dans l'ordre de préférence
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def available_encodings():
+    return [name for name, _ in ENCODINGS if name != 'br' or brotli is not None]
+
+
+def negotiate(accept_encodings, encodings):
+    # Codage préféré par le serveur parmi ceux acceptés (q > 0) par le client
+    for name in encodings:
+        if accept_encodings[name] > 0:
+            return name
+    return None
+
+
+def compress(data, encoding, gzip_level=6, brotli_quality=5):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class Compressor:
+    # Compression des réponses dynamiques et service des variantes .br/.gz de static/
+    def __init__(self, app=None):
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', self.gzip_level)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', self.brotli_quality)
+        self.static_folder = app.static_folder
+        self.send_static_file = app.view_functions['static']
+        app.view_functions['static'] = self.static_view
+        app.after_request(self._compress)
+        app.extensions['compressor'] = self
+
+    def _compress(self, response):
+        if response.mimetype not in COMPRESSIBLE:
+            return response
+        response.vary.add('Accept-Encoding')
+
+        # Flux (SSE, fichiers envoyés par send_file) : jamais mis en mémoire pour être compressés
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or (response.content_length or 0) < self.min_size
+        ):
+            return response
+
+        encoding = negotiate(request.accept_encodings, available_encodings())
+        if encoding is None:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding, self.gzip_level, self.brotli_quality))
+        response.headers['Content-Encoding'] = encoding
+        # Corps différent selon le codage : l'ETag devient faible (les 304 restent valides)
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def static_view(self, filename):
+        # Variante précompressée par build_assets.py si elle existe, sinon le fichier d'origine
+        encoding = negotiate(request.accept_encodings, [name for name, _ in ENCODINGS])
+        if encoding:
+            suffix = dict(ENCODINGS)[encoding]
+            path = safe_join(self.static_folder, filename)
+            if path and os.path.isfile(path + suffix):
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                response = send_from_directory(self.static_folder, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                response.vary.add('Accept-Encoding')
+                return response
+        return self.send_static_file(filename=filename)
+
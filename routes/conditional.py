@@ -0,0 +1,25 @@
+# routes/conditional.py
+import hashlib
+
+from flask import request, make_response
+
+
+def make_etag(*parts):
+    # Empreinte des marqueurs de version (ids, révisions, utilisateur) : jamais du contenu rendu
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:20]
+
+
+def not_modified(etag):
+    # 304 sans corps si le client possède déjà cette version (comparaison faible : la
+    # compression rend l'ETag faible)
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = make_response('', 304)
+    return revalidate(response, etag)
+
+
+def revalidate(response, etag):
+    # Mise en cache privée, revalidée à chaque usage
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -5,6 +5,127 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     TEMPLATES_AUTO_RELOAD = True
 
+    # Journalisation JSON via une file et un thread d'écriture ; niveaux par module :
+    # LOG_LEVELS="routes.dashboard=DEBUG,sqlalchemy.engine=INFO"
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+    LOG_FILE = os.environ.get('LOG_FILE')
+    # 'external' : fichier commun rouvert après logrotate (sans copytruncate) ;
+    # 'size' / 'time' : rotation par le processus, un fichier par pid (app.<pid>.log)
+    LOG_ROTATION = os.environ.get('LOG_ROTATION', 'external')
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    LOG_ROTATE_WHEN = 'midnight'
+    LOG_BACKUP_COUNT = 7
+
+    # Précompilation des templates et connexion à la base au démarrage du worker
+    WARMUP = os.environ.get('WARMUP', '0') == '1'
+
+    # Diffusion temps réel des messages : 'memory' (un worker) ou 'file' (plusieurs workers)
+    REALTIME_BACKEND = os.environ.get('REALTIME_BACKEND', 'memory')
+    REALTIME_BROKER_PATH = os.environ.get('REALTIME_BROKER_PATH')
+    REALTIME_HISTORY = 200
+    REALTIME_STREAM_TIMEOUT = 25
+    REALTIME_STREAM_LIFETIME = 300
+    # Flux simultanés par worker ; au-delà (ou à 0) la réponse se ferme après le rattrapage
+    # et EventSource se reconnecte toutes les REALTIME_POLL_INTERVAL secondes
+    REALTIME_MAX_STREAMS = int(os.environ.get('REALTIME_MAX_STREAMS', 8))
+    REALTIME_POLL_INTERVAL = 5
+    # Messages récents renvoyés même sous le dernier id reçu (validations dans le désordre)
+    REALTIME_REORDER_WINDOW = 30
+
+    # Hachage des mots de passe : coût bcrypt et calculs simultanés pour toute la machine
+    # (fichiers verrous dans PASSWORD_HASH_LOCK_DIR, instance/bcrypt-slots par défaut)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_SLOTS = int(os.environ.get('PASSWORD_HASH_SLOTS', 2))
+    PASSWORD_HASH_LOCK_DIR = os.environ.get('PASSWORD_HASH_LOCK_DIR')
+    PASSWORD_HASH_TIMEOUT = 5
+
+    # Envoi des e-mails via la table outbound_emails
+    # (SMTP_USE_SSL=0 pour un serveur local de test type aiosmtpd)
+    SMTP_SERVER = os.environ.get('SMTP_SERVER')
+    SMTP_PORT = int(os.environ.get('SMTP_PORT', 465))
+    SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+    SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+    SMTP_USE_SSL = os.environ.get('SMTP_USE_SSL', '1') == '1'
+    SMTP_TIMEOUT = 15
+    SMTP_IDLE_TIMEOUT = 60
+    FEEDBACK_RECEIVER = os.environ.get('FEEDBACK_RECEIVER')
+    MAIL_BATCH_SIZE = 20
+    MAIL_MAX_ATTEMPTS = 6
+    MAIL_RETRY_BASE = 30
+    MAIL_SEND_LEASE = 300
+    MAIL_POLL_INTERVAL = 30
+
+    # Photos de profil : variantes carrées générées à l'envoi
+    AVATAR_SIZES = (60, 120, 256)
+    AVATAR_MAX_BYTES = 10 * 1024 * 1024
+    AVATAR_MAX_PIXELS = 40_000_000
+
+    # Cache d'identité (utilisateur connecté, rang, rôles par projet)
+    IDENTITY_CACHE_SIZE = 1024
+    IDENTITY_CACHE_TTL = 300
+
+    # Pool de connexions par worker (ignoré sous SQLite) et réplica de lecture optionnel
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 280))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 10000))
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+
+    # Sessions de connexion (table user_sessions) : durée, cache de validation, purge
+    SESSION_LIFETIME_DAYS = 30
+    SESSION_CACHE_TTL = 30
+    SESSION_PURGE_BATCH = 1000
+
+    # Compression des réponses (brotli si le module est installé, sinon gzip)
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 5
+
+    # Historique des messages (pagination par curseur)
+    MESSAGE_PAGE_SIZE = 50
+    MESSAGE_PAGE_MAX = 200
+
+    # Pièces jointes : hors de static/, servies seulement après contrôle d'accès
+    ATTACHMENT_FOLDER = os.environ.get('ATTACHMENT_FOLDER', 'storage/attachments')
+    ATTACHMENT_MAX_BYTES = 500 * 1024 * 1024
+    ATTACHMENT_CHUNK_SIZE = 4 * 1024 * 1024
+    ATTACHMENT_UPLOAD_TTL = 24 * 3600
+    # Total des envois non rattachés à un message, par utilisateur
+    ATTACHMENT_PENDING_MAX_BYTES = 1024 * 1024 * 1024
+    # '' (envoi par Flask), 'x-sendfile' (Apache) ou 'x-accel-redirect' (nginx, location internal)
+    ATTACHMENT_SENDFILE = os.environ.get('ATTACHMENT_SENDFILE', '')
+    ATTACHMENT_ACCEL_PREFIX = os.environ.get('ATTACHMENT_ACCEL_PREFIX', '/protected-attachments/')
+
+    # Journal d'audit : insertion par lots de AUDIT_BATCH_SIZE ou toutes les AUDIT_FLUSH_INTERVAL secondes
+    AUDIT_BATCH_SIZE = 100
+    AUDIT_FLUSH_INTERVAL = 5
+    AUDIT_BUFFER_MAX = 10000
+    AUDIT_PAGE_SIZE = 50
+
+    # Limitation de débit par IP et par utilisateur (seau à jetons), sur les requêtes d'écriture
+    RATELIMIT_ENABLED = True
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'memory')
+    RATELIMIT_STORE_PATH = os.environ.get('RATELIMIT_STORE_PATH')
+    RATELIMITS = {
+        'auth.login': ('10/minute', '50/hour'),
+        'auth.register': ('5/hour',),
+        'public.send_contact_message': ('3/minute', '20/day'),
+        'dashboard.send_message': ('30/minute',),
+    }
+    # Échecs de connexion par identifiant : seau distinct du seau par IP, débité après un mot de passe refusé
+    RATELIMIT_LOGIN_FAILURES = ('20/hour',)
+
+    # Cache des fragments de templates (barre latérale, cartes de projets)
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_SIZE = 2048
+    FRAGMENT_CACHE_TTL = 300
+
+    # Réactions proposées sous chaque message
+    MESSAGE_REACTIONS = ('👍', '❤️', '😂', '🎉', '😮', '😢')
+
 class DevConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///users.db'
@@ -12,3 +133,7 @@ class DevConfig(Config):
 class ProdConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///prod.db')
+    REALTIME_BACKEND = os.environ.get('REALTIME_BACKEND', 'file')
+    # Workers Passenger mono-thread : un flux bloquerait le worker entier, interrogation par défaut
+    REALTIME_MAX_STREAMS = int(os.environ.get('REALTIME_MAX_STREAMS', 0))
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'file')
@@ -1,26 +1,43 @@
 # routes/dashboard/routes.py
 
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, current_app, Response, abort, session, stream_with_context
 from flask_login import login_required, current_user, logout_user
 from sqlalchemy import or_
-from routes.extensions import db, bcrypt
-from routes.models import Group, User, GroupMembership
+from sqlalchemy.exc import IntegrityError
+from routes.extensions import db, hub, identity_cache, password_hasher, avatars, user_sessions, attachments, audit, fragment_cache
+from routes.attachments import UploadError
+from routes.audit import ACTIONS as AUDIT_ACTIONS
+from routes.images import InvalidImage
+from routes.search import search_users, search_group_ids, paginate
+from routes.models import Group, User, GroupMembership, File
 from . import dashboard_bp
 from .forms import GroupForm, UserForm, MemberSearchForm, BaseSettingsForm, PasswordForm, PreferencesForm, DeleteAccountForm
-from .utils import get_chefs_de_groupe, get_all_ranks
+from .utils import get_chefs_de_groupe, get_all_ranks, has_project_role, can_read_discussion, can_post_in_discussion, paginate_messages, messages_since, paginate_projects, project_cards_by_id, paginate_audit
+from routes.serializers import (
+    memberships_with_users, discussions_with_creators,
+    serialize_message, serialize_message_row, reaction_summaries, attachment_summaries, serialize_attachment
+)
+from routes.realtime import sse_event
+from routes.database import read_replica, pool_status
+from routes.conditional import make_etag, not_modified, revalidate
+from routes.mindmaps import apply_operations, current_snapshot, default_snapshot, MindMapConflict, InvalidOperation
 from flask import jsonify
+from werkzeug.http import parse_content_range_header
 from werkzeug.utils import secure_filename
-import os
-import uuid
 import json
+import logging
+from datetime import datetime, timedelta
+import time
+
+logger = logging.getLogger(__name__)
 
 @dashboard_bp.route('/create', methods=['GET', 'POST'])
 @login_required
 def create_group():
-    if not current_user.rank or current_user.rank.name != 'admin':
+    if current_user.rank_name != 'admin':
         flash("Accès réservé aux administrateurs.", "danger")
         return redirect(url_for('dashboard.projects'))
-    print("run create group")
+    logger.debug("Création de projet demandée par %s", current_user.id)
     group_form = GroupForm()
     group_form.chef_id.choices = [(u.id, f"{u.first_name} {u.last_name}") for u in get_chefs_de_groupe()]
 
@@ -45,12 +62,14 @@ def create_group():
         )
         db.session.add(membership)
         db.session.commit()
+        identity_cache.invalidate(group.created_by)
+        fragment_cache.invalidate_user(group.created_by)
 
         flash("Projet créé avec succès", "success")
         return redirect(url_for('dashboard.create_group'))
 
     if 'submit_user' in request.form and user_form.validate_on_submit():
-        hashed_pw = bcrypt.generate_password_hash(user_form.password.data).decode('utf-8')
+        hashed_pw = password_hasher.hash(user_form.password.data)
         user = User(
             username=user_form.username.data,
             password_hash=hashed_pw,
@@ -80,7 +99,7 @@ def add_user_to_group():
     group = Group.query.get_or_404(group_id)
     user = User.query.get_or_404(user_id)
 
-    if not current_user.rank or current_user.rank.name not in ['admin', 'chef_de_groupe']:
+    if current_user.rank_name not in ['admin', 'chef_de_groupe']:
         flash("Accès refusé. Seuls les admins et chefs peuvent ajouter des membres.", "danger")
         return redirect(url_for('dashboard.project_view', project_id=group.id))
 
@@ -102,6 +121,10 @@ def add_user_to_group():
         )
         db.session.add(membership)
         db.session.commit()
+        audit.record('group.add_member', current_user.id, {'group_id': group.id, 'user_id': user.id, 'role': role})
+        identity_cache.invalidate(user.id)
+        fragment_cache.invalidate_user(user.id)
+        fragment_cache.invalidate_project(group.id)
         flash(f"{user.first_name} a été ajouté au projet comme {role}.", "success")
 
     return redirect(url_for('dashboard.project_view', project_id=group.id))
@@ -120,7 +143,7 @@ def remove_user_from_group(group_id, user_id):
         flash("Utilisateur non trouvé dans ce projet.", "warning")
         return redirect(url_for('dashboard.project_view', project_id=group.id))
 
-    is_admin = current_user.rank and current_user.rank.name == 'admin'
+    is_admin = current_user.rank_name == 'admin'
     is_chef = current_user.id == group.created_by
 
     if not (is_admin or is_chef):
@@ -131,17 +154,24 @@ def remove_user_from_group(group_id, user_id):
         flash("Seul un admin peut gérer le chef de groupe.", "warning")
         return redirect(url_for('dashboard.project_view', project_id=group.id))
 
-    user_rank = user_to_remove.rank.name if user_to_remove.rank else "membre"
+    user_rank = user_to_remove.rank_name or "membre"
 
     if user_rank in ["trésorier", "messager"]:
         from routes.models import Rank
         new_rank = Rank.query.filter_by(name="membre").first()
         user_to_remove.rank = new_rank
         db.session.commit()
+        audit.record('group.demote_member', current_user.id, {'group_id': group.id, 'user_id': user_to_remove.id})
+        identity_cache.invalidate(user_to_remove.id)
+        fragment_cache.invalidate_user(user_to_remove.id)
         flash(f"{user_to_remove.username} est redevenu membre.", "info")
     elif user_rank == "membre":
         db.session.delete(membership)
         db.session.commit()
+        audit.record('group.remove_member', current_user.id, {'group_id': group.id, 'user_id': user_to_remove.id})
+        identity_cache.invalidate(user_to_remove.id)
+        fragment_cache.invalidate_user(user_to_remove.id)
+        fragment_cache.invalidate_project(group.id)
         flash(f"{user_to_remove.username} a été retiré du projet.", "info")
     elif user_rank == "chef":
         flash("Impossible de supprimer un chef de groupe (sauf admin).", "danger")
@@ -151,31 +181,34 @@ def remove_user_from_group(group_id, user_id):
 
 @dashboard_bp.route('/projects')
 @login_required
+@read_replica
 def projects():
-    from routes.models import Group, GroupMembership, Rank
-
-    search_query = request.args.get('search')
-
-    is_admin = current_user.rank and current_user.rank.name == 'admin'
-
-    if is_admin:
-        base_query = Group.query
+    search_query = request.args.get('search', '')
+    page = request.args.get('page', 1, type=int)
+    after_id = request.args.get('after', type=int)
+    before_id = request.args.get('before', type=int)
+
+    is_admin = current_user.rank_name == 'admin'
+
+    if search_query.strip():
+        # Recherche : classement par pertinence, pagination par numéro de page
+        pagination = search_group_ids(search_query, page, visible_to=None if is_admin else current_user.id)
+        cards = project_cards_by_id(current_user.id, pagination.items)
+        cursors = None
     else:
-        base_query = Group.query.filter(
-            or_(
-                Group.created_by == current_user.id,
-                Group.memberships.any(GroupMembership.user_id == current_user.id)
-            )
-        )
-
-    if search_query:
-        user_projects = base_query.filter(Group.name.ilike(f'%{search_query}%')).all()
-    else:
-        user_projects = base_query.all()
+        cards, has_next, has_prev = paginate_projects(current_user.id, is_admin, after_id, before_id)
+        pagination = None
+        cursors = {
+            'after': cards[-1].id if cards and has_next else None,
+            'before': cards[0].id if cards and has_prev else None,
+        }
 
     return render_template(
         'dashboard/projects.html',
-        projects=user_projects,
+        projects=cards,
+        pagination=pagination,
+        cursors=cursors,
+        search=search_query,
         user=current_user
     )
 
@@ -185,8 +218,7 @@ def projects():
 def project_view(project_id):
     group = Group.query.get_or_404(project_id)
 
-    memberships = GroupMembership.query.filter_by(group_id=group.id).all()
-    member_ids = [m.user_id for m in memberships]
+    memberships = memberships_with_users().filter_by(group_id=group.id).all()
 
     users_by_rank = {
         'chef': [],
@@ -208,18 +240,51 @@ def project_view(project_id):
     treasurers_list = users_by_rank.get('trésorier', [])
     tresorier_user = treasurers_list[0] if treasurers_list else None
 
-    all_users = User.query.filter(User.id.notin_(member_ids)).all()
-
     return render_template(
         'dashboard/project-view.html',
         group=group,
         users_by_rank=users_by_rank,
-        all_users=all_users,
         user=current_user,
         tresorier=tresorier_user
     )
 
 
+@dashboard_bp.route('/project/<int:project_id>/member-candidates')
+@login_required
+def member_candidates(project_id):
+    if current_user.rank_name not in ['admin', 'chef_de_groupe']:
+        return jsonify(error="Accès refusé"), 403
+
+    q = request.args.get('q', '').strip()
+    after = request.args.get('after')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+
+    # Utilisateurs hors du projet, par ordre de username (unique => curseur stable)
+    already_member = db.session.query(GroupMembership.id).filter(
+        GroupMembership.group_id == project_id,
+        GroupMembership.user_id == User.id
+    ).exists()
+    query = db.session.query(User.id, User.username, User.first_name, User.last_name) \
+        .filter(~already_member)
+    if q:
+        query = query.filter(or_(
+            User.username.startswith(q, autoescape=True),
+            User.first_name.startswith(q, autoescape=True),
+            User.last_name.startswith(q, autoescape=True)
+        ))
+    if after:
+        query = query.filter(User.username > after)
+
+    rows = query.order_by(User.username.asc()).limit(limit + 1).all()
+    return jsonify(
+        users=[
+            {"id": r.id, "username": r.username, "name": f"{r.first_name} {r.last_name}"}
+            for r in rows[:limit]
+        ],
+        next_cursor=rows[limit - 1].username if len(rows) > limit else None
+    )
+
+
 @dashboard_bp.route('/messages')
 @login_required
 def messages():
@@ -230,7 +295,7 @@ def messages():
     memberships = GroupMembership.query.filter_by(user_id=current_user.id, role_in_group='messager').all()
     group_ids = [m.group_id for m in memberships]
 
-    discussions = Discussion.query.filter(
+    discussions = discussions_with_creators().filter(
         or_(
             Discussion.created_by == current_user.id,
             Discussion.admin_id == current_user.id,
@@ -280,10 +345,10 @@ def create_discussion():
 
     admin_users = User.query.filter_by(rank_id=admin_rank.id).all() if admin_rank else []
 
-    if current_user.rank and current_user.rank.name == 'admin':
+    if current_user.rank_name == 'admin':
         messager_user_ids = db.session.query(GroupMembership.user_id).filter_by(role_in_group='messager').distinct()
         messager_users = User.query.filter(User.id.in_(messager_user_ids)).all()
-        print(messager_users)
+        logger.debug("Destinataires messagers : %s", messager_users)
         # Fusionne les deux listes sans doublons
         all_recipients = {u.id: f"{u.first_name} {u.last_name}" for u in admin_users + messager_users}
     else:
@@ -327,42 +392,129 @@ def create_discussion():
     
 @dashboard_bp.route('/get-messages/<int:discussion_id>')
 @login_required
+@read_replica
 def get_messages(discussion_id):
-    from routes.models import Message, Discussion, GroupMembership
-    from sqlalchemy import and_
+    from routes.models import Discussion, Message
 
+    before_id = request.args.get("before_id", type=int)
     after_id = request.args.get("after_id", type=int)
+    limit = request.args.get("limit", current_app.config['MESSAGE_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['MESSAGE_PAGE_MAX']))
 
-    discussion = Discussion.query.get_or_404(discussion_id)
+    # Discussion et dernier id en une requête : MAX(id) se lit sur l'index (discussion_id, id)
+    last_id = db.select(db.func.max(Message.id)).where(Message.discussion_id == Discussion.id).scalar_subquery()
 
-    is_creator = discussion.created_by == current_user.id
-    is_admin = discussion.admin_id == current_user.id
-    membership = GroupMembership.query.filter_by(
-        user_id=current_user.id,
-        group_id=discussion.group_id
-    ).first()
+    row = db.session.query(Discussion, last_id).filter(Discussion.id == discussion_id).first()
+    if row is None:
+        abort(404)
+    discussion, last_message_id = row
 
-    if not (is_creator or is_admin or membership):
+    if not can_read_discussion(discussion, current_user):
         return {"error": "Accès refusé."}, 403
 
-    query = Message.query.filter_by(discussion_id=discussion.id)
-    if after_id:
-        query = query.filter(Message.id > after_id)
+    etag = make_etag('messages', current_user.id, discussion.id, discussion.title, last_message_id,
+                     discussion.reactions_version, before_id, after_id, limit)
+    cached = not_modified(etag)
+    if cached:
+        return cached
 
-    messages = query.order_by(Message.sent_at.asc()).all()
+    messages, has_more = paginate_messages(discussion.id, before_id=before_id, after_id=after_id, limit=limit)
+    reactions = reaction_summaries([m.id for m in messages], current_user.id)
+    files = attachment_summaries([m.id for m in messages])
 
-    return {
+    return revalidate(jsonify({
         "discussion_title": discussion.title,
         "messages": [
-            {
-                "id": m.id,
-                "content": m.content,
-                "sent_at": m.sent_at.strftime("%d/%m/%Y %H:%M"),
-                "from_current_user": m.sender_id == current_user.id,
-                "sender_name": f"{m.sender.first_name} {m.sender.last_name}"
-            } for m in messages
+            dict(serialize_message_row(m), from_current_user=m.sender_id == current_user.id,
+                 reactions=reactions.get(m.id, []), attachments=files.get(m.id, []))
+            for m in messages
+        ],
+        "has_more": has_more
+    }), etag)
+
+
+@dashboard_bp.route('/stream-messages/<int:discussion_id>')
+@login_required
+def stream_messages(discussion_id):
+    from routes.models import Discussion
+
+    discussion = Discussion.query.get_or_404(discussion_id)
+
+    if not can_read_discussion(discussion, current_user):
+        return {"error": "Accès refusé."}, 403
+
+    # EventSource renvoie Last-Event-ID à la reconnexion
+    last_id = request.headers.get("Last-Event-ID", type=int)
+    if last_id is None:
+        last_id = request.args.get("last_id", 0, type=int)
+
+    config = current_app.config
+    window = config['REALTIME_REORDER_WINDOW']
+    user_id = current_user.id
+
+    def fetch(cursor, sent):
+        # La base fait foi : le hub ne sert qu'à réveiller le flux, un message validé
+        # en retard (id inférieur au curseur) est rattrapé par la fenêtre de messages_since
+        rows = [m for m in messages_since(discussion, cursor, window) if m.id not in sent]
+        reactions = reaction_summaries([m.id for m in rows], user_id)
+        files = attachment_summaries([m.id for m in rows])
+        payloads = [
+            dict(serialize_message_row(m), reactions=reactions.get(m.id, []), attachments=files.get(m.id, []))
+            for m in rows
         ]
-    }
+        # Libère la connexion avant de garder le worker ouvert
+        db.session.close()
+        return payloads
+
+    def events(cursor, payloads, sent):
+        # Id SSE = plus grand id envoyé, pour que Last-Event-ID ne recule pas
+        for payload in payloads:
+            cursor = max(cursor, payload["id"])
+            sent[payload["id"]] = time.monotonic()
+            yield cursor, sse_event(cursor, payload)
+
+    backlog = fetch(last_id, {})
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if not hub.acquire_stream():
+        # Interrogation : rattrapage puis fermeture, EventSource revient après retry
+        def poll():
+            yield f"retry: {config['REALTIME_POLL_INTERVAL'] * 1000}\n\n"
+            for _, event in events(last_id, backlog, {}):
+                yield event
+
+        return Response(poll(), mimetype="text/event-stream", headers=headers)
+
+    timeout = config['REALTIME_STREAM_TIMEOUT']
+    lifetime = config['REALTIME_STREAM_LIFETIME']
+
+    def stream():
+        cursor, sent = last_id, {}
+        yield "retry: 3000\n\n"
+        for cursor, event in events(cursor, backlog, sent):
+            yield event
+
+        # Seuil du hub distinct du curseur : un événement absent de la base (message supprimé)
+        # ne doit pas réveiller le flux en boucle
+        seen = cursor
+        deadline = time.monotonic() + lifetime
+        while time.monotonic() < deadline:
+            woken = hub.wait(discussion_id, max(seen, cursor), timeout)
+            seen = max([seen] + [event_id for event_id, _ in woken])
+            now = time.monotonic()
+            for message_id in [i for i, at in sent.items() if now - at > 2 * window]:
+                del sent[message_id]
+            payloads = fetch(cursor, sent)
+            if not payloads:
+                if not woken:
+                    yield ": keepalive\n\n"
+                continue
+            for cursor, event in events(cursor, payloads, sent):
+                yield event
+
+    response = Response(stream_with_context(stream()), mimetype="text/event-stream", headers=headers)
+    response.call_on_close(hub.release_stream)
+    return response
 
 
 @dashboard_bp.route('/send-message', methods=['POST'])
@@ -372,14 +524,22 @@ def send_message():
 
     data = request.get_json()
     discussion_id = data.get('discussion_id')
-    content = data.get('content')
+    content = data.get('content') or ''
+    upload_ids = data.get('attachments') or []
 
     discussion = Discussion.query.get_or_404(discussion_id)
 
     # Vérifie accès
-    if current_user.id not in [discussion.created_by, discussion.admin_id]:
+    if not can_post_in_discussion(discussion, current_user):
         return {"error": "Accès refusé."}, 403
 
+    try:
+        uploads = [attachments.claim(u, current_user.id, discussion.id) for u in upload_ids]
+    except UploadError as e:
+        return _upload_error(e)
+    if not content.strip() and not uploads:
+        return {"error": "Message vide."}, 400
+
     new_msg = Message(
         sender_id=current_user.id,
         group_id=discussion.group_id,
@@ -387,40 +547,195 @@ def send_message():
         discussion_id=discussion.id
     )
     db.session.add(new_msg)
+    db.session.flush()
+    files = [
+        File(message_id=new_msg.id, file_url=u['key'], name=u['name'], size=u['size'], content_type=u['content_type'])
+        for u in uploads
+    ]
+    db.session.add_all(files)
     db.session.commit()
+    for upload_id in upload_ids:
+        attachments.release(upload_id)
+
+    payload = dict(serialize_message(new_msg, current_user), attachments=[serialize_attachment(f) for f in files])
+    hub.publish(discussion.id, payload)
+
+    return dict(payload, from_current_user=True)
+
+
+def _upload_error(error):
+    body = {"error": str(error)}
+    if error.offset is not None:
+        body["offset"] = error.offset
+    return body, error.status
+
 
+def _upload_status(upload_id, meta):
     return {
-        "id": new_msg.id,
-        "content": new_msg.content,
-        "sent_at": new_msg.sent_at.strftime("%d/%m/%Y %H:%M"),
-        "from_current_user": True,
-        "sender_name": f"{current_user.first_name} {current_user.last_name}"
+        "upload_id": upload_id,
+        "offset": attachments.offset(upload_id, meta),
+        "complete": bool(meta.get('key'))
     }
+
+
+@dashboard_bp.route('/attachments/uploads', methods=['POST'])
+@login_required
+def start_upload():
+    from routes.models import Discussion
+
+    data = request.get_json(silent=True) or {}
+    discussion = Discussion.query.get_or_404(data.get('discussion_id'))
+    if not can_post_in_discussion(discussion, current_user):
+        return {"error": "Accès refusé."}, 403
+
+    size = data.get('size')
+    if not isinstance(size, int):
+        return {"error": "Taille invalide."}, 400
+
+    try:
+        upload_id = attachments.start(current_user.id, discussion.id, data.get('name'), size, data.get('content_type'))
+    except UploadError as e:
+        return _upload_error(e)
+
+    return {
+        "upload_id": upload_id,
+        "offset": 0,
+        "chunk_size": current_app.config['ATTACHMENT_CHUNK_SIZE']
+    }, 201
+
+
+@dashboard_bp.route('/attachments/uploads/<upload_id>', methods=['GET', 'PUT'])
+@login_required
+def upload_chunk(upload_id):
+    # GET : position de reprise ; PUT : morceau brut avec Content-Range: bytes début-fin/total
+    try:
+        if request.method == 'GET':
+            return _upload_status(upload_id, attachments.load(upload_id, current_user.id))
+
+        content_range = parse_content_range_header(request.headers.get('Content-Range'))
+        length = request.content_length
+        if content_range is None or content_range.units != 'bytes' or length is None \
+                or content_range.stop - content_range.start != length:
+            return {"error": "En-têtes Content-Range / Content-Length requis."}, 400
+
+        meta = attachments.write_chunk(
+            upload_id, current_user.id, content_range.start, content_range.length, length, request.stream
+        )
+    except UploadError as e:
+        return _upload_error(e)
+
+    return _upload_status(upload_id, meta)
+
+
+@dashboard_bp.route('/attachments/<int:file_id>')
+@login_required
+def download_attachment(file_id):
+    from routes.models import Message, Discussion
+
+    row = db.session.query(File, Discussion) \
+        .join(Message, Message.id == File.message_id) \
+        .join(Discussion, Discussion.id == Message.discussion_id) \
+        .filter(File.id == file_id).first()
+    if row is None:
+        abort(404)
+    file, discussion = row
+    if not can_read_discussion(discussion, current_user):
+        return {"error": "Accès refusé."}, 403
+
+    return attachments.send(file)
+
+
+def _reaction_request(message_id):
+    # Emoji de la palette et discussion lisible ; renvoie (discussion, emoji, réponse d'erreur)
+    from routes.models import Message, Discussion
+
+    emoji = (request.get_json(silent=True) or {}).get('emoji')
+    if emoji not in current_app.config['MESSAGE_REACTIONS']:
+        return None, None, ({"error": "Réaction invalide."}, 400)
+
+    discussion = db.session.query(Discussion) \
+        .join(Message, Message.discussion_id == Discussion.id) \
+        .filter(Message.id == message_id).first()
+    if discussion is None:
+        abort(404)
+    if not can_read_discussion(discussion, current_user):
+        return None, None, ({"error": "Accès refusé."}, 403)
+    return discussion, emoji, None
+
+
+def _bump_reactions_version(discussion):
+    # Même transaction que la réaction : l'ETag des messages change avec elle
+    from routes.models import Discussion
+
+    Discussion.query.filter_by(id=discussion.id) \
+        .update({Discussion.reactions_version: Discussion.reactions_version + 1}, synchronize_session=False)
+
+
+def _reaction_payload(message_id):
+    return {
+        "message_id": message_id,
+        "reactions": reaction_summaries([message_id], current_user.id).get(message_id, [])
+    }
+
+
+@dashboard_bp.route('/message/<int:message_id>/react', methods=['POST'])
+@login_required
+def react_to_message(message_id):
+    from routes.models import MessageReaction
+
+    discussion, emoji, error = _reaction_request(message_id)
+    if error:
+        return error
+
+    db.session.add(MessageReaction(user_id=current_user.id, message_id=message_id, emoji=emoji))
+    try:
+        db.session.flush()
+        _bump_reactions_version(discussion)
+        db.session.commit()
+    except IntegrityError:
+        # Double clic ou deuxième onglet : la contrainte unique garde une seule réaction
+        db.session.rollback()
+
+    return _reaction_payload(message_id)
+
+
+@dashboard_bp.route('/message/<int:message_id>/unreact', methods=['POST'])
+@login_required
+def unreact_to_message(message_id):
+    from routes.models import MessageReaction
+
+    discussion, emoji, error = _reaction_request(message_id)
+    if error:
+        return error
+
+    deleted = MessageReaction.query.filter_by(user_id=current_user.id, message_id=message_id, emoji=emoji) \
+        .delete(synchronize_session=False)
+    if deleted:
+        _bump_reactions_version(discussion)
+    db.session.commit()
+
+    return _reaction_payload(message_id)
     
 @dashboard_bp.route('/members', methods=['GET', 'POST'])
 @login_required
+@read_replica
 def members():
-    if not current_user.rank or current_user.rank.name != 'admin':
+    if current_user.rank_name != 'admin':
         flash("Accès réservé aux administrateurs.", "danger")
         return redirect(url_for('dashboard.projects'))
 
     form = MemberSearchForm()
-    query = form.query.data or ""
-
-    members_query = User.query
-
-    if query:
-        # Recherche sur username ou prénom
-        members_query = members_query.filter(
-            or_(
-                User.username.ilike(f"%{query}%"),
-                User.first_name.ilike(f"%{query}%")
-            )
-        )
+    query = form.query.data or request.args.get('query', '')
+    page = request.args.get('page', 1, type=int)
 
-    members = members_query.order_by(User.first_name.asc()).all()
+    if query.strip():
+        # Index plein texte : username, prénom, nom, email, classés par pertinence
+        results = search_users(query, page)
+    else:
+        results = paginate(User.query.order_by(User.first_name.asc(), User.id.asc()), page)
 
-    return render_template("dashboard/members.html", form=form, members=members, user=current_user)
+    return render_template("dashboard/members.html", form=form, members=results.items,
+                           pagination=results, query=query, user=current_user)
     
 @dashboard_bp.route('/edit-member/<int:user_id>', methods=['GET', 'POST'])
 @login_required
@@ -428,7 +743,7 @@ def edit_member(user_id):
     from routes.models import User
     from .forms import EditUserForm
 
-    if not current_user.rank or current_user.rank.name != 'admin':
+    if current_user.rank_name != 'admin':
         flash("Accès réservé aux administrateurs.", "danger")
         return redirect(url_for('dashboard.members'))
 
@@ -437,6 +752,7 @@ def edit_member(user_id):
     form.rank_id.choices = [(r.id, r.name.capitalize()) for r in get_all_ranks()]
 
     if form.validate_on_submit():
+        old_rank_id = user.rank_id
         user.username = form.username.data
         user.first_name = form.first_name.data
         user.last_name = form.last_name.data
@@ -445,30 +761,91 @@ def edit_member(user_id):
         user.phone = form.phone.data
         user.rank_id = form.rank_id.data
 
+        old_picture = None
         if form.profile_picture.data:
-            picture = form.profile_picture.data
-            filename = secure_filename(picture.filename)
-            ext = filename.rsplit('.', 1)[-1].lower()
-            if ext in ['png', 'jpg', 'jpeg', 'gif']:
-                unique_filename = f"{user.id}_{uuid.uuid4().hex}.{ext}"
-                upload_folder = os.path.join('static', 'images/user_image/')
-                os.makedirs(upload_folder, exist_ok=True)
-                path = os.path.join(upload_folder, unique_filename)
-                picture.save(path)
-                user.profile_picture_url = f"/static/images/user_image/{unique_filename}"
+            try:
+                new_picture = avatars.process(form.profile_picture.data.stream)
+            except InvalidImage as e:
+                flash(str(e), "danger")
+                return render_template('dashboard/edit_member.html', form=form, user=user)
+            if new_picture != user.profile_picture_url:
+                old_picture = user.profile_picture_url
+                user.profile_picture_url = new_picture
 
         if form.delete_account.data:
+            identity_cache.invalidate(user.id)
+            fragment_cache.invalidate_user(user.id)
+            user_sessions.revoke_user(user.id)
+            picture = user.profile_picture_url
+            audit.detach_user(user.id)
+            audit.record('member.delete', current_user.id, {'user_id': user.id, 'username': user.username},
+                         critical=True)
             db.session.delete(user)
             db.session.commit()
+            avatars.discard(picture)
+            avatars.discard(old_picture)
             flash("Compte utilisateur supprimé.", "info")
             return redirect(url_for('dashboard.members'))
 
+        if user.rank_id != old_rank_id:
+            audit.record('member.rank_change', current_user.id,
+                         {'user_id': user.id, 'from': old_rank_id, 'to': user.rank_id}, critical=True)
+        else:
+            audit.record('member.update', current_user.id, {'user_id': user.id})
         db.session.commit()
+        identity_cache.invalidate(user.id)
+        fragment_cache.invalidate_user(user.id)
+        avatars.discard(old_picture)
         flash("Informations mises à jour avec succès.", "success")
         return redirect(url_for('dashboard.members'))
 
     return render_template('dashboard/edit_member.html', form=form, user=user)
-    
+
+
+def _parse_day(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d') if value else None
+    except ValueError:
+        return None
+
+
+@dashboard_bp.route('/audit')
+@login_required
+def audit_log():
+    if current_user.rank_name != 'admin':
+        flash("Accès réservé aux administrateurs.", "danger")
+        return redirect(url_for('dashboard.projects'))
+
+    # Les événements encore en mémoire dans ce worker apparaissent tout de suite
+    audit.flush()
+
+    filters = {
+        'username': request.args.get('username', '').strip(),
+        'action': request.args.get('action', ''),
+        'start': request.args.get('start', ''),
+        'end': request.args.get('end', ''),
+    }
+    start = _parse_day(filters['start'])
+    end = _parse_day(filters['end'])
+    # Filtre sur le nom enregistré : l'historique d'un compte supprimé reste consultable
+    entries, has_older, has_newer = paginate_audit(
+        actor_name=filters['username'] or None,
+        action=filters['action'] if filters['action'] in AUDIT_ACTIONS else None,
+        start=start,
+        end=end + timedelta(days=1) if end else None,
+        before_id=request.args.get('before', type=int),
+        after_id=request.args.get('after', type=int),
+        limit=current_app.config['AUDIT_PAGE_SIZE']
+    )
+    cursors = {
+        'before': entries[-1].id if entries and has_older else None,
+        'after': entries[0].id if entries and has_newer else None,
+    }
+
+    return render_template('dashboard/audit.html', entries=entries, cursors=cursors, filters=filters,
+                           actions=AUDIT_ACTIONS, user=current_user)
+
+
 @dashboard_bp.route('/settings', methods=['GET', 'POST'])
 @login_required
 def settings():
@@ -478,54 +855,74 @@ def settings():
     delete_form = DeleteAccountForm()
 
     if "submit_base" in request.form and base_form.validate_on_submit():
-        print("[DEBUG] Mise à jour infos de base.")
+        logger.debug("Mise à jour des informations de base de %s", current_user.id)
         current_user.username = base_form.username.data
         current_user.email = base_form.email.data
         current_user.phone = base_form.phone.data
         current_user.age = base_form.age.data
         db.session.commit()
+        identity_cache.invalidate(current_user.id)
+        fragment_cache.invalidate_user(current_user.id)
         flash("Informations mises à jour", "success")
         return redirect(url_for('dashboard.settings'))
 
     if "submit_password" in request.form and password_form.validate_on_submit():
-        print("[DEBUG] Changement mot de passe")
-        if bcrypt.check_password_hash(current_user.password_hash, password_form.current_password.data):
-            current_user.password_hash = bcrypt.generate_password_hash(password_form.new_password.data).decode('utf-8')
+        logger.debug("Changement de mot de passe de %s", current_user.id)
+        if password_hasher.verify(current_user.password_hash, password_form.current_password.data):
+            current_user.password_hash = password_hasher.hash(password_form.new_password.data)
+            db.session.commit()
+            # Les autres appareils sont déconnectés, celui-ci repart sur une nouvelle session
+            user_sessions.revoke_user(current_user.id)
+            session['session_token'] = user_sessions.create(current_user.id, request.remote_addr)
             db.session.commit()
+            identity_cache.invalidate(current_user.id)
+            fragment_cache.invalidate_user(current_user.id)
             flash("Mot de passe mis à jour", "success")
         else:
             flash("Mot de passe actuel incorrect", "danger")
         return redirect(url_for('dashboard.settings'))
 
     if "submit_preferences" in request.form and preferences_form.validate_on_submit():
-        print("[DEBUG] Préférences soumises")
+        logger.debug("Préférences soumises par %s", current_user.id)
         current_user.theme = preferences_form.theme.data
         current_user.language = preferences_form.language.data
 
+        old_picture = None
         picture = preferences_form.profile_picture.data
         if picture:
-            print("[DEBUG] Nouvelle image détectée")
             filename = secure_filename(picture.filename)
             ext = filename.rsplit('.', 1)[-1].lower()
             if ext in ['png', 'jpg', 'jpeg', 'gif']:
-                unique_filename = f"{current_user.id}_{uuid.uuid4().hex}.{ext}"
-                upload_folder = os.path.join('static', 'images/user_image/')
-                os.makedirs(upload_folder, exist_ok=True)
-                path = os.path.join(upload_folder, unique_filename)
-                picture.save(path)
-                current_user.profile_picture_url = f"/static/images/user_image/{unique_filename}"
-                print("[DEBUG] Image sauvegardée")
+                try:
+                    new_picture = avatars.process(picture.stream)
+                except InvalidImage as e:
+                    flash(str(e), "danger")
+                    return redirect(url_for('dashboard.settings'))
+                if new_picture != current_user.profile_picture_url:
+                    old_picture = current_user.profile_picture_url
+                    current_user.profile_picture_url = new_picture
             else:
-                print("[DEBUG] Extension non autorisée :", ext)
+                logger.info("Photo de profil refusée, extension non autorisée : %s", ext)
 
         db.session.commit()
+        identity_cache.invalidate(current_user.id)
+        fragment_cache.invalidate_user(current_user.id)
+        avatars.discard(old_picture)
         flash("Préférences mises à jour", "success")
         return redirect(url_for('dashboard.settings'))
     
     if "delete_account" in request.form and delete_form.validate_on_submit():
-        print("[DEBUG] Compte supprimé")
+        logger.info("Compte supprimé", extra={'user_id': current_user.id})
+        identity_cache.invalidate(current_user.id)
+        fragment_cache.invalidate_user(current_user.id)
+        user_sessions.revoke_user(current_user.id)
+        picture = current_user.profile_picture_url
+        audit.detach_user(current_user.id)
+        audit.record('account.delete', None, {'user_id': current_user.id, 'username': current_user.username},
+                     critical=True, actor_name=current_user.username)
         db.session.delete(current_user)
         db.session.commit()
+        avatars.discard(picture)
         flash("Compte supprimé", "info")
         return redirect(url_for('auth.logout'))
 
@@ -541,64 +938,88 @@ def settings():
 @dashboard_bp.route('/project/<int:project_id>/mind-map')
 @login_required
 def mind_map(project_id):
-    from routes.models import Group, MindMap
+    group, mindmap = _group_with_mind_map(project_id)
+
+    # Pas d'ETag sur la page (profil, rôle et assets y figurent) : le 304 se fait sur /mind-map/data
+    # et le JSON n'est reconstruit depuis les nœuds que si la révision a changé
+    snapshot = current_snapshot(mindmap)
+
+    return render_template(
+        "dashboard/mind_map.html",
+        project=group,
+        mindmap=mindmap,
+        mindmap_data=json.loads(snapshot),
+        user=current_user
+    )
 
-    print("\n--- [DEBUG] Entrée route /mind-map ---")
-    group = Group.query.get_or_404(project_id)
-    print(f"[DEBUG] Groupe trouvé : {group.name} (ID={group.id})")
 
-    mindmap = MindMap.query.filter_by(group_id=project_id).first()
+@dashboard_bp.route('/project/<int:project_id>/mind-map/data')
+@login_required
+def mind_map_data(project_id):
+    # Interrogé périodiquement par l'éditeur : 304 tant que la révision n'a pas bougé
+    group, mindmap = _group_with_mind_map(project_id)
+
+    etag = make_etag('mind-map-data', group.id, mindmap.revision)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    return revalidate(current_app.response_class(
+        '{"revision": %d, "data": %s}' % (mindmap.revision, current_snapshot(mindmap)),
+        mimetype='application/json'
+    ), etag)
+
+
+def _group_with_mind_map(project_id):
+    from routes.models import MindMap
+
+    row = db.session.query(Group, MindMap).outerjoin(MindMap, MindMap.group_id == Group.id) \
+        .filter(Group.id == project_id).first()
+    if row is None:
+        abort(404)
+    group, mindmap = row
 
     if not mindmap:
-        print("[DEBUG] Aucune mindmap existante, création en cours...")
-        default_data = {
-            "nodeData": {
-                "id": "root",
-                "topic": group.name,
-                "children": [],
-                "root": True  # <-- 🔥 AJOUT CRITIQUE
-            },
-            "linkData": {},
-            "noteData": {},
-            "expand": {}
-        }
         mindmap = MindMap(
             group_id=project_id,
             title="Carte Mentale",
-            data=json.dumps(default_data)
+            data=json.dumps(default_snapshot(group.name))
         )
         db.session.add(mindmap)
         db.session.commit()
-        print("[DEBUG] Mindmap créée et ajoutée à la DB.")
-
+        logger.debug("Carte mentale créée pour le projet %s", project_id)
+    return group, mindmap
 
-    print("[DEBUG] Données de la mindmap :")
-    print(mindmap.data)
-    print("--- [DEBUG] Fin route /mind-map ---\n")
 
-    return render_template(
-        "dashboard/mind_map.html",
-        project=group,
-        mindmap=mindmap,
-        user=current_user
-    )
-
-
-@dashboard_bp.route('/project/<int:project_id>/mind-map/save', methods=['POST'])
+@dashboard_bp.route('/project/<int:project_id>/mind-map/patch', methods=['POST'])
 @login_required
-def save_mind_map(project_id):
+def patch_mind_map(project_id):
     from routes.models import MindMap
-    group = Group.query.get_or_404(project_id)
 
-    if current_user.role_in_project(project_id) not in ['chef', 'trésorier']:
-        print(f"[ERROR] Accès refusé à l'utilisateur {current_user.username}")
+    if not has_project_role(current_user.id, project_id, ['chef', 'trésorier']):
         return jsonify(error="Accès refusé"), 403
 
-    data = request.get_json()
-    print(f"[DEBUG] Données reçues pour sauvegarde : {data}")
-
+    data = request.get_json() or {}
+    logger.debug("Patch de la carte mentale du projet %s : %s", project_id, data)
     mind_map = MindMap.query.filter_by(group_id=project_id).first_or_404()
-    mind_map.data = json.dumps(data)
+
+    try:
+        revision = apply_operations(mind_map, data.get('revision'), data.get('ops') or [])
+    except MindMapConflict:
+        db.session.rollback()
+        current = db.session.query(MindMap.revision).filter_by(id=mind_map.id).scalar()
+        return jsonify(error="La carte a été modifiée entre-temps", revision=current), 409
+    except InvalidOperation as e:
+        db.session.rollback()
+        return jsonify(error=str(e)), 400
+
     db.session.commit()
-    print("[DEBUG] Mindmap sauvegardée avec succès.")
-    return jsonify(success=True)
+    return jsonify(success=True, revision=revision)
+
+
+@dashboard_bp.route('/pool-status')
+@login_required
+def database_pool_status():
+    if current_user.rank_name != 'admin':
+        return jsonify(error="Accès refusé"), 403
+    return jsonify(pool_status(db))
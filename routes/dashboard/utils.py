@@ -1,9 +1,103 @@
 # routes/dashboard/utils.py
+from datetime import datetime, timedelta
 
-from routes.models import User, Rank
+from sqlalchemy import or_, and_
+
+from routes.extensions import db
+from routes.models import User, Rank, Message, Group, GroupMembership, AuditLog
+from routes.serializers import message_rows, project_card_rows
 
 def get_chefs_de_groupe():
     return User.query.all()
     
 def get_all_ranks():
-    return Rank.query.order_by(Rank.level.desc()).all()
\ No newline at end of file
+    return Rank.query.order_by(Rank.level.desc()).all()
+
+def has_project_role(user_id, project_id, roles=None):
+    # Autorisations lues en base : le cache d'identité d'un autre worker peut garder
+    # un rôle retiré jusqu'à son TTL, il ne sert qu'à l'affichage
+    query = GroupMembership.query.filter_by(user_id=user_id, group_id=project_id)
+    if roles:
+        query = query.filter(GroupMembership.role_in_group.in_(roles))
+    return db.session.query(query.exists()).scalar()
+
+def can_read_discussion(discussion, user):
+    if user.id in (discussion.created_by, discussion.admin_id):
+        return True
+    return has_project_role(user.id, discussion.group_id)
+
+def can_post_in_discussion(discussion, user):
+    # Même règle pour les messages et leurs pièces jointes
+    return user.id in (discussion.created_by, discussion.admin_id)
+
+def paginate_messages(discussion_id, before_id=None, after_id=None, limit=50):
+    # Pagination par curseur sur l'index (discussion_id, id)
+    query = message_rows().filter(Message.discussion_id == discussion_id)
+    if after_id:
+        rows = query.filter(Message.id > after_id).order_by(Message.id.asc()).limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
+
+    if before_id:
+        query = query.filter(Message.id < before_id)
+    rows = query.order_by(Message.id.desc()).limit(limit + 1).all()
+    return list(reversed(rows[:limit])), len(rows) > limit
+
+def messages_since(discussion, last_id, window):
+    # Au-delà de last_id, plus les messages des dernières secondes : une transaction plus lente
+    # peut valider un id inférieur après la diffusion d'un id supérieur (index group_id, sent_at)
+    cutoff = datetime.utcnow() - timedelta(seconds=window)
+    return message_rows().filter(
+        Message.discussion_id == discussion.id,
+        or_(Message.id > last_id, and_(Message.group_id == discussion.group_id, Message.sent_at >= cutoff))
+    ).order_by(Message.id.asc()).all()
+
+def visible_projects(query, user_id, is_admin):
+    if is_admin:
+        return query
+    member = GroupMembership.query.filter(
+        GroupMembership.group_id == Group.id,
+        GroupMembership.user_id == user_id
+    ).exists()
+    return query.filter(or_(Group.created_by == user_id, member))
+
+def paginate_projects(user_id, is_admin, after_id=None, before_id=None, limit=24):
+    # Pagination par clé (Group.id) : coût constant quelle que soit la page
+    query = visible_projects(project_card_rows(user_id), user_id, is_admin)
+    if before_id:
+        rows = query.filter(Group.id < before_id).order_by(Group.id.desc()).limit(limit + 1).all()
+        return list(reversed(rows[:limit])), True, len(rows) > limit
+
+    if after_id:
+        query = query.filter(Group.id > after_id)
+    rows = query.order_by(Group.id.asc()).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit, after_id is not None
+
+def paginate_audit(actor_name=None, action=None, start=None, end=None, before_id=None, after_id=None, limit=50):
+    # Plus récents d'abord, pagination par clé sur AuditLog.id (index (actor_name, id) / (action, id))
+    query = db.session.query(
+        AuditLog.id, AuditLog.action, AuditLog.details, AuditLog.created_at, AuditLog.user_id, AuditLog.actor_name
+    )
+    if actor_name:
+        query = query.filter(AuditLog.actor_name == actor_name)
+    if action:
+        query = query.filter(AuditLog.action == action)
+    if start:
+        query = query.filter(AuditLog.created_at >= start)
+    if end:
+        query = query.filter(AuditLog.created_at < end)
+
+    if after_id:
+        rows = query.filter(AuditLog.id > after_id).order_by(AuditLog.id.asc()).limit(limit + 1).all()
+        return list(reversed(rows[:limit])), True, len(rows) > limit
+
+    if before_id:
+        query = query.filter(AuditLog.id < before_id)
+    rows = query.order_by(AuditLog.id.desc()).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit, before_id is not None
+
+def project_cards_by_id(user_id, ids):
+    # Cartes des résultats de recherche, dans l'ordre de pertinence
+    if not ids:
+        return []
+    by_id = {row.id: row for row in project_card_rows(user_id).filter(Group.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id]
@@ -0,0 +1,91 @@
+# routes/database.py
+from functools import wraps
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+
+REPLICA_BIND = 'replica'
+
+
+def engine_options(url, pool_size, max_overflow, pool_timeout, pool_recycle,
+                   pool_pre_ping, statement_timeout=None):
+    # Options du pool selon le dialecte ; SQLite garde les réglages par défaut
+    backend = make_url(url).get_backend_name()
+    if backend == 'sqlite':
+        return {}
+
+    options = {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        # Sous le wait_timeout de MySQL pour ne jamais réutiliser une connexion fermée
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': pool_pre_ping,
+    }
+    if statement_timeout:
+        if backend in ('mysql', 'mariadb'):
+            options['connect_args'] = {'init_command': f"SET SESSION max_execution_time={int(statement_timeout)}"}
+        elif backend == 'postgresql':
+            options['connect_args'] = {'options': f"-c statement_timeout={int(statement_timeout)}"}
+    return options
+
+
+def configure_engines(app):
+    # À appeler avant db.init_app : traduit les réglages DB_* en options d'engine
+    config = app.config
+    options = dict(
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        pool_timeout=config['DB_POOL_TIMEOUT'],
+        pool_recycle=config['DB_POOL_RECYCLE'],
+        pool_pre_ping=config['DB_POOL_PRE_PING'],
+        statement_timeout=config['DB_STATEMENT_TIMEOUT'],
+    )
+    config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(config['SQLALCHEMY_DATABASE_URI'], **options))
+
+    replica_url = config.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds.setdefault(REPLICA_BIND, dict(engine_options(replica_url, **options), url=replica_url))
+        config['SQLALCHEMY_BINDS'] = binds
+
+
+class RoutingSession(Session):
+    # Lectures vers le réplica dans les vues marquées @read_replica, écritures toujours sur le primaire
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_app_context()
+            and g.get('use_replica')
+            and REPLICA_BIND in self._db.engines
+            and getattr(clause, 'is_select', False)
+        ):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.use_replica = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.use_replica = False
+    return wrapper
+
+
+def pool_status(db):
+    # État des pools par bind (clé None = primaire), pour la supervision
+    stats = {}
+    for key, engine in db.engines.items():
+        pool = engine.pool
+        entry = {'class': type(pool).__name__}
+        for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+            method = getattr(pool, name, None)
+            if callable(method):
+                entry[name] = method()
+        stats[key or 'primary'] = entry
+    return stats
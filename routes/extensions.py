@@ -1,6 +1,33 @@
 # routes/extensions.py
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from .realtime import MessageHub
+from .identity import IdentityCache
+from .passwords import PasswordHasher
+from .mailer import Outbox
+from .images import AvatarStore
+from .database import RoutingSession
+from .sessions import SessionRegistry
+from .metrics import Metrics
+from .assets import AssetManifest
+from .compression import Compressor
+from .attachments import AttachmentStore
+from .audit import AuditTrail
+from .ratelimit import RateLimiter
+from .fragments import FragmentCache
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
+hub = MessageHub()
+identity_cache = IdentityCache()
+password_hasher = PasswordHasher()
+outbox = Outbox()
+avatars = AvatarStore()
+user_sessions = SessionRegistry()
+metrics = Metrics()
+assets = AssetManifest()
+compressor = Compressor()
+attachments = AttachmentStore()
+audit = AuditTrail()
+rate_limiter = RateLimiter()
+fragment_cache = FragmentCache()
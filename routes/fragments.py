@@ -0,0 +1,84 @@
+# routes/fragments.py
+import threading
+import time
+from collections import OrderedDict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class FragmentCache:
+    # Fragments HTML rendus une fois puis réutilisés (LRU + TTL, comme le cache d'identité).
+    # Clé : nom, portée d'invalidation ("user:5", "project:3") et sa version, puis les valeurs dont dépend le rendu
+    def __init__(self, app=None, maxsize=2048, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = True
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('FRAGMENT_CACHE_SIZE', self.maxsize)
+        # Invalidation locale au worker : les templates mettent aussi dans la clé des valeurs lues en base
+        # (users.updated_at, photo de profil), un autre worker ne sert donc jamais un fragment périmé
+        self.ttl = app.config.get('FRAGMENT_CACHE_TTL', self.ttl)
+        self.enabled = app.config.get('FRAGMENT_CACHE_ENABLED', True)
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.extend(fragment_cache=self)
+        app.extensions['fragment_cache'] = self
+
+    def render(self, name, scope, parts, caller):
+        if not self.enabled:
+            return caller()
+
+        now = time.monotonic()
+        with self._lock:
+            key = (name, scope, self._versions.get(scope, 0), *parts)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] >= now:
+                self._entries.move_to_end(key)
+                return Markup(entry[0])
+
+        html = caller()
+        with self._lock:
+            self._entries[key] = (str(html), now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return html
+
+    def invalidate(self, scope):
+        # Les entrées de l'ancienne version ne sont plus lues et sortent de la LRU
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def invalidate_user(self, user_id):
+        self.invalidate(f"user:{user_id}")
+
+    def invalidate_project(self, project_id):
+        self.invalidate(f"project:{project_id}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FragmentCacheExtension(Extension):
+    # {% cache "nom", "portée", valeur, ... %} ... {% endcache %}
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(args)]), [], [], body).set_lineno(lineno)
+
+    def _render(self, args, caller):
+        name, scope, *parts = args
+        return self.environment.fragment_cache.render(name, scope, parts, caller)
@@ -0,0 +1,90 @@
+# routes/identity.py
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import make_transient_to_detached
+
+
+class IdentityCache:
+    # Cache LRU + TTL de l'utilisateur connecté, de son rang et de ses rôles par projet ;
+    # chaque requête revérifie (updated_at, rank_id) en base, les rôles par projet ne servent qu'à l'affichage
+    def __init__(self, app=None, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('IDENTITY_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', self.ttl)
+        app.extensions['identity_cache'] = self
+
+    def _get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry['expires_at'] < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry
+
+    def _put(self, user_id, entry):
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def load(self, user_id):
+        from .extensions import db
+        from .models import User, GroupMembership
+
+        entry = self._get(user_id)
+        if entry is not None:
+            # Version relue en base à chaque requête (clé primaire, une ligne) : un changement de rang
+            # ou de profil fait dans un autre worker périme l'entrée, le rang admin n'est jamais servi périmé
+            version = db.session.query(User.updated_at, User.rank_id).filter(User.id == user_id).first()
+            if version is None:
+                self.invalidate(user_id)
+                return None
+            columns = entry['columns']
+            if tuple(version) != (columns['updated_at'], columns['rank_id']):
+                self.invalidate(user_id)
+                entry = None
+
+        if entry is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                return None
+            roles = db.session.query(GroupMembership.group_id, GroupMembership.role_in_group) \
+                .filter(GroupMembership.user_id == user_id).all()
+            entry = {
+                # Sans le hash du mot de passe : rechargé depuis la base seulement quand on le vérifie
+                'columns': {c.key: getattr(user, c.key) for c in User.__mapper__.column_attrs
+                            if c.key != 'password_hash'},
+                'rank_name': user.rank_name,
+                'group_roles': dict(roles),
+                'expires_at': time.monotonic() + self.ttl
+            }
+            self._put(user_id, entry)
+        else:
+            # Reconstruit l'instance sans requête : colonnes marquées comme déjà chargées
+            user = User(**entry['columns'])
+            make_transient_to_detached(user)
+            user = db.session.merge(user, load=False)
+
+        user._identity = entry
+        return user
@@ -0,0 +1,114 @@
+# routes/images.py
+import hashlib
+import io
+import os
+import re
+
+from flask import current_app, request, has_request_context
+from PIL import Image, ImageOps
+
+AVATAR_URL_PREFIX = '/static/images/user_image/'
+VARIANT_PATTERN = re.compile(r'^(?P<base>.*/[0-9a-f]{16})_(?P<size>\d+)\.(?P<ext>jpg|webp)$')
+FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+class InvalidImage(Exception):
+    pass
+
+
+class AvatarStore:
+    # Miniatures carrées WebP/JPEG nommées par empreinte du contenu
+    def __init__(self, app=None):
+        self.sizes = (60, 120, 256)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.sizes = tuple(sorted(app.config.get('AVATAR_SIZES', self.sizes)))
+        app.add_template_global(self.url, 'avatar_url')
+        app.add_template_global(self.variant_format, 'avatar_format')
+        app.extensions['avatars'] = self
+
+    @property
+    def folder(self):
+        return os.path.join(current_app.static_folder, 'images', 'user_image')
+
+    def _path(self, url):
+        return os.path.join(current_app.root_path, url.lstrip('/'))
+
+    def url(self, url, size):
+        # Variante la plus proche ; les anciennes images non traitées sont servies telles quelles
+        if not url:
+            return None
+        match = VARIANT_PATTERN.match(url)
+        if not match:
+            return url
+        size = next((s for s in self.sizes if s >= size), self.sizes[-1])
+        return f"{match.group('base')}_{size}.{self.variant_format()}"
+
+    def variant_format(self):
+        # Fait partie de la clé des fragments qui affichent un avatar
+        return 'webp' if self._accepts_webp() else 'jpg'
+
+    def _accepts_webp(self):
+        # Comparaison exacte : "*/*" ne suffit pas (Safari n'annonce pas WebP)
+        if not has_request_context():
+            return False
+        return any(mime == 'image/webp' for mime, _ in request.accept_mimetypes)
+
+    def process(self, stream):
+        max_bytes = current_app.config['AVATAR_MAX_BYTES']
+        data = stream.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise InvalidImage("Fichier trop volumineux.")
+
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        try:
+            image = Image.open(io.BytesIO(data))
+            # Seul l'en-tête est lu ici : on refuse avant de décoder les pixels
+            if image.width * image.height > current_app.config['AVATAR_MAX_PIXELS']:
+                raise InvalidImage("Image trop grande.")
+            image = ImageOps.exif_transpose(image)
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            else:
+                image = image.convert('RGB')
+        except (OSError, Image.DecompressionBombError):
+            raise InvalidImage("Image illisible.")
+
+        os.makedirs(self.folder, exist_ok=True)
+        for size in self.sizes:
+            variant = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            for ext, fmt, options in FORMATS:
+                path = os.path.join(self.folder, f"{digest}_{size}.{ext}")
+                if not os.path.exists(path):
+                    variant.save(path, fmt, **options)
+
+        return f"{AVATAR_URL_PREFIX}{digest}_{self.sizes[-1]}.jpg"
+
+    def discard(self, url):
+        # À appeler après le commit : les fichiers partagés par un autre compte sont conservés
+        from .models import User
+
+        if not url or not url.startswith(AVATAR_URL_PREFIX):
+            return
+        match = VARIANT_PATTERN.match(url)
+        base = match.group('base') if match else url
+        if User.query.filter(User.profile_picture_url.like(f"{base}%")).first():
+            return
+
+        if match:
+            paths = [self._path(f"{base}_{size}.{ext}") for size in self.sizes for ext, _, _ in FORMATS]
+        else:
+            paths = [self._path(url)]
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,114 @@
+# routes/logs.py
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, request, has_request_context
+
+# Attributs standard d'un LogRecord : tout le reste vient de extra={...}
+RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'request_id'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'request_id': getattr(record, 'request_id', None),
+            'message': record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in RESERVED})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    # Côté requête : fige le message, l'id de requête et la trace avant de passer au thread d'écriture
+    def prepare(self, record):
+        record.request_id = g.get('request_id') if has_request_context() else None
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _file_handler(config):
+    # Plusieurs workers Passenger écrivent en même temps : jamais de rotation d'un fichier partagé
+    path = config['LOG_FILE']
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rotation = config['LOG_ROTATION']
+    if rotation == 'external':
+        handler = logging.handlers.WatchedFileHandler(path, encoding='utf-8')
+    else:
+        root, ext = os.path.splitext(path)
+        path = f"{root}.{os.getpid()}{ext}"
+        if rotation == 'time':
+            handler = logging.handlers.TimedRotatingFileHandler(
+                path, when=config['LOG_ROTATE_WHEN'], backupCount=config['LOG_BACKUP_COUNT'], encoding='utf-8')
+        elif rotation == 'size':
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=config['LOG_MAX_BYTES'], backupCount=config['LOG_BACKUP_COUNT'], encoding='utf-8')
+        else:
+            raise ValueError(f"LOG_ROTATION inconnu : {rotation}")
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def parse_levels(value):
+    # "routes.dashboard=DEBUG,sqlalchemy.engine=INFO" -> {'routes.dashboard': 'DEBUG', ...}
+    if isinstance(value, dict):
+        return value
+    levels = {}
+    for item in (value or '').split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(app):
+    # Un seul thread d'écriture par processus, même si create_app est appelé plusieurs fois
+    global _listener
+    config = app.config
+    if config.get('LOG_FILE') is None:
+        config['LOG_FILE'] = os.path.join(app.root_path, 'logs', 'app.log')
+
+    root = logging.getLogger()
+    root.setLevel(config['LOG_LEVEL'])
+    for name, level in parse_levels(config['LOG_LEVELS']).items():
+        logging.getLogger(name).setLevel(level)
+
+    if _listener is None:
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, _file_handler(config), respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(ContextQueueHandler(log_queue))
+
+    app.before_request(_assign_request_id)
+    app.after_request(_expose_request_id)
+
+
+def _assign_request_id():
+    g.request_id = request.headers.get('X-Request-ID', '')[:64] or uuid.uuid4().hex
+
+
+def _expose_request_id(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    return response
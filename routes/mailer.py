@@ -0,0 +1,195 @@
+# routes/mailer.py
+import smtplib
+import ssl
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+
+class Outbox:
+    # File d'envoi persistante : la requête HTTP ne fait qu'un INSERT,
+    # un thread d'arrière-plan envoie par lots sur une connexion SMTP réutilisée
+    def __init__(self, app=None):
+        self.app = None
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._smtp = None
+        self._smtp_used_at = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['outbox'] = self
+
+    @property
+    def config(self):
+        return self.app.config
+
+    def enqueue(self, recipient, subject, body_html=None, body_text=None, reply_to=None):
+        from .extensions import db
+        from .models import OutboundEmail
+
+        email = OutboundEmail(
+            sender=self.config.get('SMTP_USERNAME'),
+            recipient=recipient,
+            reply_to=reply_to,
+            subject=subject,
+            body_html=body_html,
+            body_text=body_text
+        )
+        db.session.add(email)
+        db.session.commit()
+        self.wake()
+        return email
+
+    def wake(self):
+        self._ensure_thread()
+        self._wakeup.set()
+
+    def _ensure_thread(self):
+        # Démarrage paresseux : Passenger fork les workers après l'import de l'app
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='outbox-sender', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.config['MAIL_POLL_INTERVAL'])
+            self._wakeup.clear()
+            try:
+                with self.app.app_context():
+                    while self.flush():
+                        pass
+            except Exception:
+                self.app.logger.exception("Erreur du thread d'envoi des e-mails")
+            self._close_idle_connection()
+
+    def _claim_batch(self):
+        from .extensions import db
+        from .models import OutboundEmail
+
+        now = datetime.utcnow()
+        lease = now + timedelta(seconds=self.config['MAIL_SEND_LEASE'])
+        candidates = OutboundEmail.query.filter(
+            OutboundEmail.status == 'pending',
+            OutboundEmail.next_attempt_at <= now
+        ).order_by(OutboundEmail.id).limit(self.config['MAIL_BATCH_SIZE']).all()
+
+        claimed = []
+        for email in candidates:
+            # Réservation optimiste : un autre worker a pu prendre la ligne entre-temps
+            updated = OutboundEmail.query.filter_by(
+                id=email.id, next_attempt_at=email.next_attempt_at
+            ).update({'next_attempt_at': lease}, synchronize_session=False)
+            if updated:
+                claimed.append(email.id)
+        db.session.commit()
+        return OutboundEmail.query.filter(OutboundEmail.id.in_(claimed)).all() if claimed else []
+
+    def flush(self):
+        from .extensions import db
+
+        batch = self._claim_batch()
+        for email in batch:
+            try:
+                message = self._build(email)
+            except ValueError as e:
+                # En-tête invalide (adresse sur plusieurs lignes...) : aucune tentative ne réussira
+                self._mark_dead(email, e)
+                db.session.commit()
+                continue
+            try:
+                self._connection().send_message(message)
+            except (smtplib.SMTPException, OSError) as e:
+                self._drop_connection()
+                self._mark_failed(email, e)
+            else:
+                email.status = 'sent'
+                email.sent_at = datetime.utcnow()
+                email.attempts += 1
+            db.session.commit()
+        return len(batch)
+
+    def drain(self):
+        # Envoi de tout ce qui est dû, hors thread (cron flush_outbox.py) : rattrape les
+        # e-mails d'un worker arrêté avant son envoi et les nouvelles tentatives d'un worker inactif
+        sent = 0
+        while True:
+            count = self.flush()
+            if not count:
+                break
+            sent += count
+        self._drop_connection()
+        return sent
+
+    def _mark_dead(self, email, error):
+        email.attempts += 1
+        email.last_error = str(error)[:1000]
+        email.status = 'dead'
+        self.app.logger.error("E-mail %s abandonné après %s tentatives : %s", email.id, email.attempts, error)
+
+    def _mark_failed(self, email, error):
+        if email.attempts + 1 >= self.config['MAIL_MAX_ATTEMPTS']:
+            self._mark_dead(email, error)
+        else:
+            email.attempts += 1
+            email.last_error = str(error)[:1000]
+            delay = self.config['MAIL_RETRY_BASE'] * 2 ** (email.attempts - 1)
+            email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+    def _build(self, email):
+        msg = EmailMessage()
+        msg['Subject'] = email.subject
+        msg['From'] = email.sender or self.config.get('SMTP_USERNAME')
+        msg['To'] = email.recipient
+        if email.reply_to:
+            msg['Reply-To'] = email.reply_to
+        msg.set_content(email.body_text or "Message au format HTML.", subtype="plain")
+        if email.body_html:
+            msg.add_alternative(email.body_html, subtype="html")
+        return msg
+
+    def _connection(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+            except (smtplib.SMTPException, OSError):
+                self._drop_connection()
+
+        if self._smtp is None:
+            server = self.config.get('SMTP_SERVER')
+            port = self.config.get('SMTP_PORT')
+            timeout = self.config['SMTP_TIMEOUT']
+            if self.config.get('SMTP_USE_SSL'):
+                smtp = smtplib.SMTP_SSL(server, port, context=ssl.create_default_context(), timeout=timeout)
+            else:
+                smtp = smtplib.SMTP(server, port, timeout=timeout)
+            if self.config.get('SMTP_USERNAME') and self.config.get('SMTP_PASSWORD'):
+                smtp.login(self.config['SMTP_USERNAME'], self.config['SMTP_PASSWORD'])
+            self._smtp = smtp
+
+        self._smtp_used_at = time.monotonic()
+        return self._smtp
+
+    def _drop_connection(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.close()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def _close_idle_connection(self):
+        if self._smtp is None:
+            return
+        if time.monotonic() - self._smtp_used_at < self.config['SMTP_IDLE_TIMEOUT']:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
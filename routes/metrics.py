@@ -0,0 +1,136 @@
+# routes/metrics.py
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from flask import g, request, has_request_context, abort, Response
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    # Compteurs en mémoire par processus : chaque worker Passenger expose les siens
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._durations = defaultdict(Histogram)
+        self._statuses = defaultdict(int)
+        self._sql_count = defaultdict(int)
+        self._sql_seconds = defaultdict(float)
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not self._listening:
+            # Toutes les engines (primaire et réplica), une seule fois par processus
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            self._listening = True
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/metrics', 'metrics', self.view)
+        app.extensions['metrics'] = self
+
+    def _start(self):
+        g.metrics_start = time.perf_counter()
+        g.sql_count = 0
+        g.sql_seconds = 0.0
+
+    def _finish(self, response):
+        start = g.get('metrics_start')
+        if start is None:
+            return response
+        duration = time.perf_counter() - start
+        endpoint = request.endpoint or 'unknown'
+        sql_count, sql_seconds = g.get('sql_count', 0), g.get('sql_seconds', 0.0)
+
+        with self._lock:
+            self._durations[endpoint].observe(duration)
+            self._statuses[(endpoint, request.method, response.status_code)] += 1
+            self._sql_count[endpoint] += sql_count
+            self._sql_seconds[endpoint] += sql_seconds
+
+        logger.info(
+            "%s %s %s %.1f ms, %d requêtes SQL (%.1f ms)",
+            request.method, endpoint, response.status_code, duration * 1000, sql_count, sql_seconds * 1000,
+            extra={
+                'endpoint': endpoint,
+                'method': request.method,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'sql_count': sql_count,
+                'sql_ms': round(sql_seconds * 1000, 2),
+            }
+        )
+        return response
+
+    def view(self):
+        if not current_user.is_authenticated or current_user.rank_name != 'admin':
+            abort(404)
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def render(self):
+        from .extensions import db
+        from .database import pool_status
+
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP http_request_duration_seconds Durée des requêtes par endpoint',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for endpoint, histogram in sorted(self._durations.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {histogram.total:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{endpoint="{endpoint}"}} {histogram.count}')
+
+            lines += ['# HELP http_requests_total Réponses par endpoint, méthode et statut', '# TYPE http_requests_total counter']
+            for (endpoint, method, status), count in sorted(self._statuses.items()):
+                lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+            lines += ['# HELP http_sql_queries_total Requêtes SQL émises par endpoint', '# TYPE http_sql_queries_total counter']
+            for endpoint, count in sorted(self._sql_count.items()):
+                lines.append(f'http_sql_queries_total{{endpoint="{endpoint}"}} {count}')
+
+            lines += ['# HELP http_sql_seconds_total Temps passé en SQL par endpoint', '# TYPE http_sql_seconds_total counter']
+            for endpoint, seconds in sorted(self._sql_seconds.items()):
+                lines.append(f'http_sql_seconds_total{{endpoint="{endpoint}"}} {seconds:.6f}')
+
+        lines += ['# HELP db_pool_connections État du pool de connexions par bind', '# TYPE db_pool_connections gauge']
+        for bind, stats in pool_status(db).items():
+            for state in ('size', 'checkedin', 'checkedout', 'overflow'):
+                if state in stats:
+                    lines.append(f'db_pool_connections{{bind="{bind}",state="{state}"}} {stats[state]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_count' in g:
+        g.sql_count += 1
+        g.sql_seconds += time.perf_counter() - context.metrics_start
@@ -0,0 +1,179 @@
+# routes/mindmaps.py
+import json
+
+from .extensions import db
+from .models import MindMap, MindMapNode
+
+# Clés du nœud MindElixir stockées dans des colonnes dédiées, le reste va dans `extra`
+NODE_KEYS = {'id', 'topic', 'children', 'style', 'root', 'parent'}
+
+
+class MindMapConflict(Exception):
+    pass
+
+
+class InvalidOperation(Exception):
+    pass
+
+
+def default_snapshot(title):
+    return {
+        "nodeData": {"id": "root", "topic": title, "children": [], "root": True},
+        "linkData": {},
+        "noteData": {},
+        "expand": {}
+    }
+
+
+def _apply_fields(node, data):
+    # Remplacement complet des champs du nœud (hors enfants et position)
+    node.content = data.get('topic') or ''
+    style = data.get('style') or {}
+    node.bg_color = style.get('background')
+    node.text_color = style.get('color')
+    extra = {k: v for k, v in data.items() if k not in NODE_KEYS and k not in ('op', 'index')}
+    node.extra = json.dumps(extra) if extra else None
+
+
+def import_snapshot(mind_map):
+    # Normalisation unique du JSON historique vers mind_map_node
+    data = json.loads(mind_map.data or "{}") or default_snapshot(mind_map.title)
+    root = data.get("nodeData") or default_snapshot(mind_map.title)["nodeData"]
+
+    def walk(node_data, parent, index):
+        node = MindMapNode(
+            mind_map_id=mind_map.id,
+            node_key=str(node_data.get('id')),
+            parent=parent,
+            sort_order=index
+        )
+        _apply_fields(node, node_data)
+        db.session.add(node)
+        for i, child in enumerate(node_data.get('children') or []):
+            walk(child, node, i)
+
+    walk(root, None, 0)
+    db.session.flush()
+
+
+def _nodes_by_key(mind_map, keys):
+    if not keys:
+        return {}
+    nodes = MindMapNode.query.filter(
+        MindMapNode.mind_map_id == mind_map.id,
+        MindMapNode.node_key.in_(keys)
+    ).all()
+    return {n.node_key: n for n in nodes}
+
+
+def _delete_subtree(mind_map, node_ids):
+    ids = list(node_ids)
+    all_ids = []
+    while ids:
+        all_ids.extend(ids)
+        ids = [row.id for row in db.session.query(MindMapNode.id).filter(
+            MindMapNode.mind_map_id == mind_map.id,
+            MindMapNode.parent_id.in_(ids)
+        )]
+    # Enfants d'abord pour respecter la clé étrangère parent_id
+    for node_id in reversed(all_ids):
+        MindMapNode.query.filter_by(id=node_id).delete(synchronize_session=False)
+
+
+def apply_operations(mind_map, revision, operations):
+    # Réservation de la révision : échoue si un autre éditeur a enregistré entre-temps
+    updated = MindMap.query.filter_by(id=mind_map.id, revision=revision).update(
+        {'revision': MindMap.revision + 1}, synchronize_session=False
+    )
+    if not updated:
+        raise MindMapConflict()
+
+    if not MindMapNode.query.filter_by(mind_map_id=mind_map.id).first():
+        import_snapshot(mind_map)
+
+    keys = set()
+    for op in operations:
+        if op.get('op') == 'meta':
+            continue
+        keys.add(str(op.get('id')))
+        if op.get('parent') is not None:
+            keys.add(str(op['parent']))
+    nodes = _nodes_by_key(mind_map, keys)
+
+    for op in operations:
+        kind = op.get('op')
+        key = str(op.get('id'))
+        node = nodes.get(key)
+
+        if kind == 'add':
+            parent = nodes.get(str(op.get('parent')))
+            if node is not None or parent is None:
+                raise InvalidOperation(f"Ajout impossible du nœud {key}")
+            node = MindMapNode(mind_map_id=mind_map.id, node_key=key, parent=parent,
+                               sort_order=op.get('index', 0))
+            _apply_fields(node, op)
+            db.session.add(node)
+            nodes[key] = node
+        elif kind == 'update':
+            if node is None:
+                raise InvalidOperation(f"Nœud inconnu {key}")
+            _apply_fields(node, op)
+        elif kind == 'move':
+            parent = nodes.get(str(op.get('parent')))
+            if node is None or parent is None or node.parent_id is None:
+                raise InvalidOperation(f"Déplacement impossible du nœud {key}")
+            node.parent = parent
+            node.sort_order = op.get('index', 0)
+        elif kind == 'delete':
+            # Idempotent : le nœud a pu partir avec un parent supprimé
+            if node is not None and node.parent_id is not None:
+                db.session.flush()
+                _delete_subtree(mind_map, [node.id])
+                nodes.pop(key)
+        elif kind == 'meta':
+            # linkData, expand... : petits objets gardés dans le JSON, nodeData y est reconstruit
+            data = json.loads(mind_map.data or "{}")
+            data.update({k: v for k, v in op.items() if k not in ('op', 'nodeData')})
+            mind_map.data = json.dumps(data)
+        else:
+            raise InvalidOperation(f"Opération inconnue : {kind}")
+
+    db.session.flush()
+    return revision + 1
+
+
+def build_snapshot(mind_map):
+    # Reconstruction paresseuse, uniquement quand la révision a bougé
+    data = json.loads(mind_map.data or "{}") or default_snapshot(mind_map.title)
+    nodes = MindMapNode.query.filter_by(mind_map_id=mind_map.id) \
+        .order_by(MindMapNode.sort_order, MindMapNode.id).all()
+    if not nodes:
+        return data
+
+    children = {}
+    root = None
+    for node in nodes:
+        if node.parent_id is None:
+            root = node
+        else:
+            children.setdefault(node.parent_id, []).append(node)
+
+    def serialize(node):
+        payload = json.loads(node.extra) if node.extra else {}
+        payload.update(id=node.node_key, topic=node.content)
+        style = {k: v for k, v in (('background', node.bg_color), ('color', node.text_color)) if v}
+        if style:
+            payload['style'] = style
+        payload['children'] = [serialize(c) for c in children.get(node.id, [])]
+        return payload
+
+    data["nodeData"] = dict(serialize(root), root=True)
+    return data
+
+
+def current_snapshot(mind_map):
+    if mind_map.snapshot_revision != mind_map.revision:
+        mind_map.data = json.dumps(build_snapshot(mind_map))
+        mind_map.snapshot_revision = mind_map.revision
+        db.session.commit()
+    return mind_map.data
@@ -33,12 +33,30 @@ class User(db.Model, UserMixin):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login_at = db.Column(db.DateTime)
+
+    # Rang et rôles servis par le cache d'identité quand l'utilisateur en provient
+    @property
+    def rank_name(self):
+        identity = getattr(self, '_identity', None)
+        if identity is not None:
+            return identity['rank_name']
+        return self.rank.name if self.rank else None
+
+    @property
+    def group_roles(self):
+        identity = getattr(self, '_identity', None)
+        if identity is not None:
+            return identity['group_roles']
+        return {m.group_id: m.role_in_group for m in self.group_memberships}
+
+    def has_group_role(self, role):
+        return role in self.group_roles.values()
+
     def is_in_project(self, project_id):
-        return any(m.group_id == project_id for m in self.group_memberships)
+        return project_id in self.group_roles
 
     def role_in_project(self, project_id):
-        membership = next((m for m in self.group_memberships if m.group_id == project_id), None)
-        return membership.role_in_group if membership else None
+        return self.group_roles.get(project_id)
         
 class Group(db.Model):
     __tablename__ = 'groups'
@@ -52,6 +70,10 @@ class Group(db.Model):
 
 class GroupMembership(db.Model):
     __tablename__ = 'group_memberships'
+    __table_args__ = (
+        db.Index('ix_group_memberships_group_id_user_id', 'group_id', 'user_id'),
+        db.Index('ix_group_memberships_user_id', 'user_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
@@ -66,6 +88,10 @@ class GroupMembership(db.Model):
 
 class Message(db.Model):
     __tablename__ = 'messages'
+    __table_args__ = (
+        db.Index('ix_messages_discussion_id_id', 'discussion_id', 'id'),
+        db.Index('ix_messages_group_id_sent_at', 'group_id', 'sent_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
@@ -85,6 +111,8 @@ class Discussion(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     admin_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Incrémenté à chaque ajout ou retrait de réaction : entre dans l'ETag des messages
+    reactions_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     group = db.relationship('Group', backref='discussions')
     creator = db.relationship('User', foreign_keys=[created_by])
@@ -93,15 +121,26 @@ class Discussion(db.Model):
 
 class File(db.Model):
     __tablename__ = 'files'
+    __table_args__ = (
+        db.Index('ix_files_message_id', 'message_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     message_id = db.Column(db.Integer, db.ForeignKey('messages.id'), nullable=False)
+    # Clé du contenu dans le stockage des pièces jointes (ab/cd/<sha256>)
     file_url = db.Column(db.Text, nullable=False)
+    name = db.Column(db.String(255))
+    size = db.Column(db.BigInteger)
+    content_type = db.Column(db.String(100))
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     message = db.relationship('Message', backref=db.backref('files', lazy=True))
 
 class MessageReaction(db.Model):
     __tablename__ = 'message_reactions'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'message_id', 'emoji', name='uq_message_reactions_user_message_emoji'),
+        db.Index('ix_message_reactions_message_id_emoji', 'message_id', 'emoji'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     message_id = db.Column(db.Integer, db.ForeignKey('messages.id'), nullable=False)
@@ -113,6 +152,10 @@ class MessageReaction(db.Model):
 
 class UserSession(db.Model):
     __tablename__ = 'user_sessions'
+    __table_args__ = (
+        db.Index('ix_user_sessions_user_id', 'user_id'),
+        db.Index('ix_user_sessions_expires_at', 'expires_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     session_token = db.Column(db.String(255), unique=True, nullable=False)
@@ -124,8 +167,16 @@ class UserSession(db.Model):
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
+    __table_args__ = (
+        db.Index('ix_audit_logs_user_id_id', 'user_id', 'id'),
+        db.Index('ix_audit_logs_action_id', 'action', 'id'),
+        db.Index('ix_audit_logs_created_at', 'created_at'),
+        db.Index('ix_audit_logs_actor_name_id', 'actor_name', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'))
+    # Nom de l'auteur au moment de l'action : reste lisible après suppression du compte
+    actor_name = db.Column(db.String(50))
     action = db.Column(db.String(255), nullable=False)
     details = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -138,20 +189,52 @@ class MindMap(db.Model):
     group_id = db.Column(db.Integer, db.ForeignKey("groups.id"), nullable=False)
     title = db.Column(db.String(255), default="Carte Mentale")
     data = db.Column(db.Text, default="{}")  # JSON brut
+    # Révision des nœuds et révision à laquelle `data` a été reconstruit
+    revision = db.Column(db.Integer, default=0, nullable=False)
+    snapshot_revision = db.Column(db.Integer, default=0, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     group = db.relationship("Group", backref="mind_map", lazy=True)
     
 class MindMapNode(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('mind_map_id', 'node_key', name='uq_mind_map_node_key'),
+        db.Index('ix_mind_map_node_parent_id', 'parent_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     mind_map_id = db.Column(db.Integer, db.ForeignKey('mind_maps.id'), nullable=False)
     parent_id = db.Column(db.Integer, db.ForeignKey('mind_map_node.id'), nullable=True)
+    node_key = db.Column(db.String(64), nullable=False, default='')  # id du nœud côté MindElixir
+    sort_order = db.Column(db.Integer, default=0, nullable=False)
+    extra = db.Column(db.Text)  # autres champs MindElixir (JSON)
     content = db.Column(db.Text, nullable=False)
     pos_x = db.Column(db.Float, default=0.0)
     pos_y = db.Column(db.Float, default=0.0)
-    bg_color = db.Column(db.String(20), default="#ffffff")
-    text_color = db.Column(db.String(20), default="#000000")
+    bg_color = db.Column(db.String(20))  # style.background, absent = thème MindElixir
+    text_color = db.Column(db.String(20))  # style.color
     type = db.Column(db.String(20), default="descriptive")  # <--- AJOUT ICI
 
     parent = db.relationship('MindMapNode', remote_side=[id], backref='children')
+
+class OutboundEmail(db.Model):
+    __tablename__ = 'outbound_emails'
+    __table_args__ = (
+        db.Index('ix_outbound_emails_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    sender = db.Column(db.String(120))
+    recipient = db.Column(db.String(120), nullable=False)
+    reply_to = db.Column(db.String(120))
+    subject = db.Column(db.String(255), nullable=False)
+    body_text = db.Column(db.Text)
+    body_html = db.Column(db.Text)
+    status = db.Column(
+        db.Enum('pending', 'sent', 'dead', name='outbound_email_status'),
+        default='pending', nullable=False
+    )
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
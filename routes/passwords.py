@@ -0,0 +1,77 @@
+# routes/passwords.py
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class FileSemaphore:
+    # Places partagées entre les workers Passenger : un fichier verrou (flock) par place,
+    # libéré par le noyau si le processus meurt en plein calcul
+    def __init__(self, folder, slots, poll=0.05):
+        self.poll = poll
+        os.makedirs(folder, exist_ok=True)
+        self.paths = [os.path.join(folder, f"slot-{i}.lock") for i in range(slots)]
+
+    @contextmanager
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            for path in self.paths:
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(fd)
+                    continue
+                try:
+                    yield
+                finally:
+                    os.close(fd)
+                return
+            if time.monotonic() >= deadline:
+                raise HasherBusy()
+            time.sleep(self.poll)
+
+
+class PasswordHasher:
+    # bcrypt est volontairement lent : au plus PASSWORD_HASH_SLOTS calculs simultanés pour
+    # tous les workers de la machine, les autres attendent une place puis reçoivent un 503
+    def __init__(self, app=None):
+        self.bcrypt = None
+        self.rounds = 12
+        self.timeout = 5
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from .extensions import bcrypt
+
+        self.bcrypt = bcrypt
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', self.rounds)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        folder = app.config.get('PASSWORD_HASH_LOCK_DIR') or os.path.join(app.instance_path, 'bcrypt-slots')
+        self._slots = FileSemaphore(folder, app.config.get('PASSWORD_HASH_SLOTS', 2))
+        app.extensions['password_hasher'] = self
+
+    def _run(self, fn, *args):
+        with self._slots.acquire(self.timeout):
+            return fn(*args)
+
+    def hash(self, password):
+        return self._run(self.bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        return self._run(self.bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        # Format bcrypt : $2b$<coût>$<sel+hash>
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
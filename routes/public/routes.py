@@ -1,8 +1,6 @@
-import os
-import smtplib
-import ssl
-from email.message import EmailMessage
-from flask import Blueprint, render_template, request, jsonify
+from email_validator import validate_email, EmailNotValidError
+from flask import Blueprint, render_template, request, jsonify, current_app
+from routes.extensions import outbox
 from . import public_bp
 
 @public_bp.route("/contact", methods=["GET"])
@@ -12,34 +10,30 @@ def contact_page():
 
 @public_bp.route("/contact/send", methods=["POST"])
 def send_contact_message():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     user_email = data.get("email")
     message_html = data.get("message")
 
     if not user_email or not message_html:
         return jsonify({"success": False, "error": "Champs manquants"}), 400
 
+    # L'adresse part dans les en-têtes Subject et Reply-To : une seule ligne, adresse valide
     try:
-        smtp_server = os.environ.get('SMTP_SERVER')
-        smtp_port = int(os.environ.get('SMTP_PORT', 465))
-        smtp_username = os.environ.get('SMTP_USERNAME')
-        smtp_password = os.environ.get('SMTP_PASSWORD')
-        receiver_email = os.environ.get('FEEDBACK_RECEIVER')
-
-        msg = EmailMessage()
-        msg['Subject'] = f"Message depuis le formulaire contact ({user_email})"
-        msg['From'] = smtp_username
-        msg['To'] = receiver_email
-        msg.set_content("Message au format HTML.", subtype="plain")
-        msg.add_alternative(message_html, subtype="html")
-
-        context = ssl.create_default_context()
-        with smtplib.SMTP_SSL(smtp_server, smtp_port, context=context) as server:
-            server.login(smtp_username, smtp_password)
-            server.send_message(msg)
-
-        return jsonify({"success": True}), 200
-
-    except Exception as e:
-        print("Erreur d'envoi :", e)
-        return jsonify({"success": False, "error": "Erreur serveur"}), 500
+        if not isinstance(user_email, str) or len(user_email) > 120:
+            raise EmailNotValidError()
+        user_email = validate_email(user_email, check_deliverability=False).normalized
+    except EmailNotValidError:
+        return jsonify({"success": False, "error": "Adresse e-mail invalide"}), 400
+
+    receiver = current_app.config.get('FEEDBACK_RECEIVER')
+    if not receiver:
+        current_app.logger.error("FEEDBACK_RECEIVER non configuré : message de contact refusé")
+        return jsonify({"success": False, "error": "Formulaire de contact indisponible pour le moment"}), 503
+
+    outbox.enqueue(
+        recipient=receiver,
+        subject=f"Message depuis le formulaire contact ({user_email})",
+        body_html=message_html,
+        reply_to=user_email
+    )
+    return jsonify({"success": True}), 202
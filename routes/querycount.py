@@ -0,0 +1,42 @@
+# routes/querycount.py
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from .extensions import db
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine=None):
+    engine = engine or db.engine
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def assert_num_queries(expected, engine=None):
+    # Exemple : with assert_num_queries(3): client.get('/dashboard/get-messages/1')
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count != expected:
+        raise AssertionError(
+            f"{counter.count} requêtes SQL exécutées, {expected} attendues :\n"
+            + "\n".join(counter.statements)
+        )
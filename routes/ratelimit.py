@@ -0,0 +1,206 @@
+# routes/ratelimit.py
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from flask import current_app, request, jsonify, render_template
+from flask_login import current_user
+
+SPEC_PATTERN = re.compile(r'^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$')
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_limit(spec):
+    # "10/minute" -> (capacité, jetons par seconde)
+    match = SPEC_PATTERN.match(spec)
+    if not match:
+        raise ValueError(f"Limite invalide : {spec}")
+    count = int(match.group(1))
+    return count, count / PERIODS[match.group(2)]
+
+
+def refill(tokens, updated, now, capacity, rate):
+    # Seau à jetons : jetons disponibles à l'instant now
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def wait_for(tokens, rate):
+    # Attente avant le prochain jeton, ou 0 s'il en reste un
+    return 0 if tokens >= 1 else (1 - tokens) / rate
+
+
+class MemoryBucketStore:
+    # Seaux en mémoire : suffisant pour un seul worker
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, buckets):
+        # buckets : [(clé, capacité, débit)] ; tout ou rien, aucun seau n'est débité si l'un est vide
+        now = time.monotonic()
+        with self._lock:
+            levels = [
+                refill(*self._buckets.get(key, (capacity, now)), now, capacity, rate)
+                for key, capacity, rate in buckets
+            ]
+            wait = max((wait_for(tokens, rate) for tokens, (_, _, rate) in zip(levels, buckets)), default=0)
+            if wait:
+                return wait
+            if len(self._buckets) + len(buckets) > self.max_keys:
+                self._prune(now)
+            for tokens, (key, _, _) in zip(levels, buckets):
+                self._buckets[key] = (tokens - 1, now)
+            return 0
+
+    def peek(self, buckets):
+        # Même calcul que take, sans débiter
+        now = time.monotonic()
+        with self._lock:
+            return max((
+                wait_for(refill(*self._buckets.get(key, (capacity, now)), now, capacity, rate), rate)
+                for key, capacity, rate in buckets
+            ), default=0)
+
+    def _prune(self, now):
+        # Après une journée d'inactivité tout seau est de nouveau plein : inutile de le garder
+        for key, (tokens, updated) in list(self._buckets.items()):
+            if now - updated > 86400:
+                del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()
+
+
+class FileBucketStore:
+    # Seaux partagés entre plusieurs workers Passenger (fichier SQLite local)
+    def __init__(self, path, cleanup_every=1000):
+        self.path = path
+        self.cleanup_every = cleanup_every
+        self._calls = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " key TEXT PRIMARY KEY,"
+                " tokens REAL NOT NULL,"
+                " updated REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def take(self, buckets):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            # Verrou d'écriture dès la lecture : tous les seaux sont vérifiés puis débités
+            # dans la même transaction, deux workers ne consomment pas le même jeton
+            conn.execute("BEGIN IMMEDIATE")
+            levels = []
+            for key, capacity, rate in buckets:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                levels.append(refill(*(row or (capacity, now)), now, capacity, rate))
+            wait = max((wait_for(tokens, rate) for tokens, (_, _, rate) in zip(levels, buckets)), default=0)
+            if not wait:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    [(key, tokens - 1, now) for tokens, (key, _, _) in zip(levels, buckets)]
+                )
+            self._calls += 1
+            if self._calls % self.cleanup_every == 0:
+                conn.execute("DELETE FROM buckets WHERE updated < ?", (now - 86400,))
+            conn.execute("COMMIT")
+        return wait
+
+    def peek(self, buckets):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            waits = []
+            for key, capacity, rate in buckets:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                waits.append(wait_for(refill(*(row or (capacity, now)), now, capacity, rate), rate))
+        return max(waits, default=0)
+
+
+class RateLimiter:
+    # Vérifié en before_request : le 429 part avant bcrypt, SMTP ou commit
+    def __init__(self, app=None):
+        self.store = None
+        self.limits = {}
+        self.login_failures = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('RATELIMIT_BACKEND', 'memory')
+        if backend == 'file':
+            path = app.config.get('RATELIMIT_STORE_PATH') or os.path.join(app.instance_path, 'ratelimit.db')
+            self.store = FileBucketStore(path)
+        elif backend == 'memory':
+            self.store = MemoryBucketStore()
+        else:
+            raise ValueError(f"RATELIMIT_BACKEND inconnu : {backend}")
+
+        self.limits = {
+            endpoint: [parse_limit(spec) for spec in specs]
+            for endpoint, specs in app.config.get('RATELIMITS', {}).items()
+        }
+        self.login_failures = [parse_limit(spec) for spec in app.config.get('RATELIMIT_LOGIN_FAILURES', ())]
+        app.before_request(self._check)
+        app.extensions['rate_limiter'] = self
+
+    def _keys(self, endpoint):
+        # Un seau par utilisateur connecté (une IP partagée ne pénalise pas tout un réseau), par IP sinon
+        if current_user.is_authenticated:
+            yield f"user:{current_user.id}"
+        else:
+            yield f"ip:{request.remote_addr}"
+
+    def _username_buckets(self, username):
+        # Seau par identifiant visé (attaque répartie sur plusieurs IP), débité uniquement sur échec :
+        # des tentatives au hasard ne bloquent pas un compte dont on ne connaît pas le mot de passe
+        username = (username or '').strip().lower()[:100]
+        if not username:
+            return []
+        return [
+            (f"auth.login_failed:{index}:username:{username}", capacity, rate)
+            for index, (capacity, rate) in enumerate(self.login_failures)
+        ]
+
+    def login_failed(self, username):
+        # Appelé par la vue de connexion après un mot de passe refusé
+        if current_app.config.get('RATELIMIT_ENABLED', True):
+            self.store.take(self._username_buckets(username))
+
+    def retry_after(self, endpoint):
+        return self.store.take([
+            (f"{endpoint}:{index}:{key}", capacity, rate)
+            for key in self._keys(endpoint)
+            for index, (capacity, rate) in enumerate(self.limits[endpoint])
+        ])
+
+    def _check(self):
+        # Seules les requêtes qui font le travail coûteux sont limitées (pas l'affichage des formulaires)
+        if not current_app.config.get('RATELIMIT_ENABLED', True) or request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return None
+        if request.endpoint not in self.limits:
+            return None
+
+        wait = 0
+        if request.endpoint == 'auth.login':
+            wait = self.store.peek(self._username_buckets(request.form.get('username')))
+        wait = wait or self.retry_after(request.endpoint)
+        if not wait:
+            return None
+
+        message = "Trop de requêtes, réessayez dans un instant"
+        if request.is_json or request.accept_mimetypes.best == 'application/json':
+            response = jsonify({"success": False, "error": message})
+        else:
+            response = render_template("error.html", message=message)
+        return response, 429, {'Retry-After': str(math.ceil(wait))}
@@ -0,0 +1,121 @@
+# routes/realtime.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import closing
+
+
+class MemoryBroker:
+    # Diffusion en mémoire : suffisant pour un seul worker
+    def __init__(self, history=200):
+        self.history = history
+        self._cond = threading.Condition()
+        self._events = {}
+
+    def publish(self, discussion_id, event_id, payload):
+        with self._cond:
+            buffer = self._events.setdefault(discussion_id, deque(maxlen=self.history))
+            buffer.append((event_id, payload))
+            self._cond.notify_all()
+
+    def wait(self, discussion_id, last_id, timeout):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                buffer = self._events.get(discussion_id, ())
+                events = [(i, p) for i, p in buffer if i > last_id]
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                self._cond.wait(remaining)
+
+
+class FileBroker:
+    # Broker local partagé entre plusieurs workers Passenger (fichier SQLite)
+    def __init__(self, path, history=200, poll_interval=0.5):
+        self.path = path
+        self.history = history
+        self.poll_interval = poll_interval
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                " discussion_id INTEGER NOT NULL,"
+                " event_id INTEGER NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " PRIMARY KEY (discussion_id, event_id))"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def publish(self, discussion_id, event_id, payload):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO events (discussion_id, event_id, payload) VALUES (?, ?, ?)",
+                (discussion_id, event_id, json.dumps(payload))
+            )
+            conn.execute(
+                "DELETE FROM events WHERE discussion_id = ? AND event_id <= ("
+                " SELECT event_id FROM events WHERE discussion_id = ?"
+                " ORDER BY event_id DESC LIMIT 1 OFFSET ?)",
+                (discussion_id, discussion_id, self.history)
+            )
+
+    def wait(self, discussion_id, last_id, timeout):
+        deadline = time.monotonic() + timeout
+        with closing(self._connect()) as conn:
+            while True:
+                rows = conn.execute(
+                    "SELECT event_id, payload FROM events"
+                    " WHERE discussion_id = ? AND event_id > ? ORDER BY event_id",
+                    (discussion_id, last_id)
+                ).fetchall()
+                if rows or time.monotonic() >= deadline:
+                    return [(i, json.loads(p)) for i, p in rows]
+                time.sleep(self.poll_interval)
+
+
+class MessageHub:
+    def __init__(self, app=None):
+        self.broker = None
+        self._streams = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('REALTIME_BACKEND', 'memory')
+        history = app.config.get('REALTIME_HISTORY', 200)
+        if backend == 'file':
+            path = app.config.get('REALTIME_BROKER_PATH') or os.path.join(app.instance_path, 'realtime.db')
+            self.broker = FileBroker(path, history=history)
+        elif backend == 'memory':
+            self.broker = MemoryBroker(history=history)
+        else:
+            raise ValueError(f"REALTIME_BACKEND inconnu : {backend}")
+        # Un flux ouvert occupe un thread du worker pendant REALTIME_STREAM_LIFETIME
+        self._streams = threading.BoundedSemaphore(app.config.get('REALTIME_MAX_STREAMS', 8)) \
+            if app.config.get('REALTIME_MAX_STREAMS', 8) > 0 else None
+        app.extensions['message_hub'] = self
+
+    def publish(self, discussion_id, payload):
+        self.broker.publish(discussion_id, payload['id'], payload)
+
+    def wait(self, discussion_id, last_id, timeout):
+        return self.broker.wait(discussion_id, last_id, timeout)
+
+    def acquire_stream(self):
+        # Sans attente : si tous les flux du worker sont pris, le client passe en interrogation
+        return self._streams is not None and self._streams.acquire(blocking=False)
+
+    def release_stream(self):
+        self._streams.release()
+
+
+def sse_event(event_id, payload):
+    return f"id: {event_id}\ndata: {json.dumps(payload)}\n\n"
@@ -0,0 +1,146 @@
+# routes/search.py
+import re
+
+from sqlalchemy import text, column
+
+from .extensions import db
+from .models import User, Group
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Colonnes indexées : FTS5 sous SQLite, FULLTEXT sous MySQL
+INDEXES = {
+    'users': ('users_fts', 'ft_users_search', ('username', 'first_name', 'last_name', 'email')),
+    'groups': ('groups_fts', 'ft_groups_search', ('name', 'description')),
+}
+
+
+class Page:
+    def __init__(self, items, page, per_page, has_next):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.has_next = has_next
+        self.has_prev = page > 1
+
+
+def _tokens(query):
+    return TOKEN_PATTERN.findall(query or '')
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def _quote(dialect, name):
+    # "groups" est un mot réservé sous MySQL 8
+    return dialect.identifier_preparer.quote(name)
+
+
+def _ranked_ids(table, query, limit, offset, visible_to=None):
+    fts_table, fulltext_name, columns = INDEXES[table]
+    tokens = _tokens(query)
+    quoted = _quote(db.engine.dialect, table)
+    params = {'limit': limit, 'offset': offset, 'uid': visible_to}
+
+    # Restriction de visibilité des projets (créateur ou membre)
+    visibility = ''
+    if visible_to is not None:
+        visibility = (
+            " AND (t.created_by = :uid OR EXISTS (SELECT 1 FROM group_memberships gm"
+            " WHERE gm.group_id = t.id AND gm.user_id = :uid))"
+        )
+
+    if _dialect() == 'sqlite':
+        # Préfixe sur chaque terme, tous les termes requis, tri par bm25
+        params['match'] = ' '.join(f'"{t}"*' for t in tokens)
+        sql = (
+            f"SELECT t.id FROM {fts_table} f JOIN {quoted} t ON t.id = f.rowid"
+            f" WHERE {fts_table} MATCH :match{visibility}"
+            f" ORDER BY f.rank, t.id LIMIT :limit OFFSET :offset"
+        )
+    elif _dialect() in ('mysql', 'mariadb'):
+        params['match'] = ' '.join(f'+{t}*' for t in tokens)
+        match = f"MATCH({', '.join('t.' + c for c in columns)}) AGAINST (:match IN BOOLEAN MODE)"
+        sql = (
+            f"SELECT t.id FROM {quoted} t WHERE {match}{visibility}"
+            f" ORDER BY {match} DESC, t.id LIMIT :limit OFFSET :offset"
+        )
+    else:
+        # Autres bases : LIKE sans classement
+        params.update({f'tok{i}': f'%{t}%' for i, t in enumerate(tokens)})
+        conditions = ' AND '.join(
+            '(' + ' OR '.join(f't.{c} LIKE :tok{i}' for c in columns) + ')'
+            for i in range(len(tokens))
+        )
+        sql = f"SELECT t.id FROM {quoted} t WHERE {conditions}{visibility} ORDER BY t.id LIMIT :limit OFFSET :offset"
+    # .columns() en fait un SELECT textuel, routable vers le réplica
+    return [row[0] for row in db.session.execute(text(sql).columns(column('id')), params)]
+
+
+def _id_page(table, query, page, per_page, visible_to=None):
+    page = max(page, 1)
+    if not _tokens(query):
+        return Page([], page, per_page, False)
+
+    ids = _ranked_ids(table, query, per_page + 1, (page - 1) * per_page, visible_to)
+    return Page(ids[:per_page], page, per_page, len(ids) > per_page)
+
+
+def _page(model, table, query, page, per_page, visible_to=None):
+    result = _id_page(table, query, page, per_page, visible_to)
+    ids = result.items
+    by_id = {obj.id: obj for obj in model.query.filter(model.id.in_(ids)).all()} if ids else {}
+    result.items = [by_id[i] for i in ids if i in by_id]
+    return result
+
+
+def search_users(query, page=1, per_page=24):
+    return _page(User, 'users', query, page, per_page)
+
+
+def search_groups(query, page=1, per_page=24, visible_to=None):
+    return _page(Group, 'groups', query, page, per_page, visible_to)
+
+
+def search_group_ids(query, page=1, per_page=24, visible_to=None):
+    # Identifiants seuls, classés : l'appelant charge ses propres colonnes
+    return _id_page('groups', query, page, per_page, visible_to)
+
+
+def paginate(query, page=1, per_page=24):
+    page = max(page, 1)
+    rows = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    return Page(rows[:per_page], page, per_page, len(rows) > per_page)
+
+
+def create_search_indexes(conn):
+    # Appelé par la migration 0003 ; les triggers gardent l'index FTS5 à jour
+    for table, (fts_table, fulltext_name, columns) in INDEXES.items():
+        cols = ', '.join(columns)
+        quoted = _quote(conn.dialect, table)
+        if conn.dialect.name == 'sqlite':
+            new_values = ', '.join(f'new.{c}' for c in columns)
+            old_values = ', '.join(f'old.{c}' for c in columns)
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+                f"{cols}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {quoted} BEGIN"
+                f" INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {quoted} BEGIN"
+                f" INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {cols} ON {quoted} BEGIN"
+                f" INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_values});"
+                f" INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+            ))
+            conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+        elif conn.dialect.name in ('mysql', 'mariadb'):
+            existing = {row[2] for row in conn.execute(text(f"SHOW INDEX FROM {quoted}"))}
+            if fulltext_name not in existing:
+                conn.execute(text(f"ALTER TABLE {quoted} ADD FULLTEXT INDEX {fulltext_name} ({cols})"))
@@ -0,0 +1,105 @@
+# routes/serializers.py
+from flask import url_for
+from sqlalchemy.orm import joinedload
+
+from .extensions import db
+from .models import User, Message, GroupMembership, Discussion, Group, MessageReaction, File
+
+# Projection colonne par colonne : un seul SELECT avec jointure sur l'expéditeur
+MESSAGE_COLUMNS = (
+    Message.id,
+    Message.content,
+    Message.sent_at,
+    Message.sender_id,
+    User.first_name,
+    User.last_name,
+)
+
+
+def message_rows():
+    return db.session.query(*MESSAGE_COLUMNS).join(User, User.id == Message.sender_id)
+
+
+def project_card_rows(user_id):
+    # Une ligne par projet avec ses agrégats, en sous-requêtes corrélées sur des index :
+    # nombre de membres, rôle de l'utilisateur, date du dernier message
+    member_count = db.select(db.func.count(GroupMembership.id)) \
+        .where(GroupMembership.group_id == Group.id).scalar_subquery()
+    role = db.select(GroupMembership.role_in_group) \
+        .where(GroupMembership.group_id == Group.id, GroupMembership.user_id == user_id) \
+        .limit(1).scalar_subquery()
+    last_activity = db.select(db.func.max(Message.sent_at)) \
+        .where(Message.group_id == Group.id).scalar_subquery()
+    return db.session.query(
+        Group.id,
+        Group.name,
+        Group.description,
+        Group.created_by,
+        member_count.label('member_count'),
+        role.label('role'),
+        last_activity.label('last_activity'),
+    )
+
+
+def reaction_summaries(message_ids, user_id):
+    # Un seul GROUP BY pour toute la page : {message_id: [{emoji, count, reacted}]}
+    if not message_ids:
+        return {}
+    reacted = db.func.max(db.case((MessageReaction.user_id == user_id, 1), else_=0))
+    rows = db.session.query(
+        MessageReaction.message_id,
+        MessageReaction.emoji,
+        db.func.count(MessageReaction.id),
+        reacted,
+    ).filter(MessageReaction.message_id.in_(message_ids)) \
+        .group_by(MessageReaction.message_id, MessageReaction.emoji) \
+        .order_by(MessageReaction.message_id, db.func.min(MessageReaction.id))
+
+    summaries = {}
+    for message_id, emoji, count, mine in rows:
+        summaries.setdefault(message_id, []).append({"emoji": emoji, "count": count, "reacted": bool(mine)})
+    return summaries
+
+
+def attachment_summaries(message_ids):
+    # Pièces jointes de toute la page en une requête : {message_id: [...]}
+    if not message_ids:
+        return {}
+    rows = db.session.query(File.id, File.message_id, File.name, File.size) \
+        .filter(File.message_id.in_(message_ids)).order_by(File.id)
+    summaries = {}
+    for row in rows:
+        summaries.setdefault(row.message_id, []).append(serialize_attachment(row))
+    return summaries
+
+
+def memberships_with_users():
+    return GroupMembership.query.options(joinedload(GroupMembership.user))
+
+
+def discussions_with_creators():
+    return Discussion.query.options(joinedload(Discussion.creator))
+
+
+def serialize_message(message, sender):
+    return {
+        "id": message.id,
+        "content": message.content,
+        "sent_at": message.sent_at.strftime("%d/%m/%Y %H:%M"),
+        "sender_id": message.sender_id,
+        "sender_name": f"{sender.first_name} {sender.last_name}"
+    }
+
+
+def serialize_attachment(file):
+    return {
+        "id": file.id,
+        "name": file.name,
+        "size": file.size,
+        "url": url_for('dashboard.download_attachment', file_id=file.id)
+    }
+
+
+def serialize_message_row(row):
+    # Les lignes de message_rows() portent aussi first_name / last_name
+    return serialize_message(row, row)
@@ -0,0 +1,112 @@
+# routes/sessions.py
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class SessionRegistry:
+    # Sessions persistées dans user_sessions ; validation mise en cache quelques secondes par worker
+    def __init__(self, app=None, lifetime_days=30, cache_ttl=30, purge_batch=1000):
+        self.lifetime = timedelta(days=lifetime_days)
+        self.cache_ttl = cache_ttl
+        self.purge_batch = purge_batch
+        self._cache = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.lifetime = timedelta(days=app.config.get('SESSION_LIFETIME_DAYS', self.lifetime.days))
+        self.cache_ttl = app.config.get('SESSION_CACHE_TTL', self.cache_ttl)
+        self.purge_batch = app.config.get('SESSION_PURGE_BATCH', self.purge_batch)
+        app.extensions['user_sessions'] = self
+
+    def create(self, user_id, ip_address=None):
+        from .extensions import db
+        from .models import UserSession
+
+        now = datetime.utcnow()
+        token = secrets.token_urlsafe(32)
+        db.session.add(UserSession(
+            user_id=user_id,
+            session_token=token,
+            ip_address=ip_address,
+            created_at=now,
+            expires_at=now + self.lifetime
+        ))
+        return token
+
+    def is_valid(self, token, user_id):
+        from .extensions import db
+        from .models import UserSession
+
+        if not token:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(token)
+        if entry is None or entry['checked_at'] + self.cache_ttl < now:
+            row = db.session.query(UserSession.user_id, UserSession.expires_at) \
+                .filter(UserSession.session_token == token).first()
+            entry = {
+                'user_id': row.user_id if row else None,
+                'expires_at': row.expires_at if row else None,
+                'checked_at': now
+            }
+            with self._lock:
+                self._cache[token] = entry
+                self._prune(now)
+
+        return (
+            entry['user_id'] == user_id
+            and (entry['expires_at'] is None or entry['expires_at'] > datetime.utcnow())
+        )
+
+    def _prune(self, now):
+        # Appelé sous verrou : retire les validations périmées
+        if len(self._cache) > 4096:
+            for key in [k for k, e in self._cache.items() if e['checked_at'] + self.cache_ttl < now]:
+                del self._cache[key]
+
+    def revoke(self, token):
+        # Déconnexion : seule la session de cet appareil est supprimée
+        from .extensions import db
+        from .models import UserSession
+
+        if not token:
+            return
+        UserSession.query.filter_by(session_token=token).delete(synchronize_session=False)
+        db.session.commit()
+        with self._lock:
+            self._cache.pop(token, None)
+
+    def revoke_user(self, user_id):
+        # Changement de mot de passe, suppression du compte : toutes les sessions
+        from .extensions import db
+        from .models import UserSession
+
+        UserSession.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+        db.session.commit()
+        with self._lock:
+            for key in [k for k, e in self._cache.items() if e['user_id'] == user_id]:
+                del self._cache[key]
+
+    def purge_expired(self, batch_size=None):
+        # Suppression par lots bornés (MySQL refuse LIMIT dans un IN (SELECT ...))
+        from .extensions import db
+        from .models import UserSession
+
+        batch_size = batch_size or self.purge_batch
+        total = 0
+        while True:
+            ids = [row[0] for row in db.session.query(UserSession.id)
+                   .filter(UserSession.expires_at < datetime.utcnow())
+                   .order_by(UserSession.expires_at)
+                   .limit(batch_size)]
+            if not ids:
+                return total
+            UserSession.query.filter(UserSession.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            total += len(ids)
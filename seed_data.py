@@ -0,0 +1,173 @@
+# seed_data.py
+# Jeu de données synthétique en volume pour les tests de charge (SQLite ou MySQL).
+# Usage : python seed_data.py --users 50000 --groups 2000 --messages 1000000
+# Tous les comptes créés ont le mot de passe "motdepasse" ; l'admin est <prefix>_admin.
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app import create_app
+from routes.extensions import db, bcrypt
+from routes.models import Rank, User, Group, GroupMembership, Discussion, Message, MindMap
+
+PASSWORD = 'motdepasse'
+FIRST_NAMES = ['Camille', 'Léa', 'Hugo', 'Lucas', 'Chloé', 'Inès', 'Louis', 'Emma', 'Nathan', 'Manon', 'Jules', 'Zoé']
+LAST_NAMES = ['Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand', 'Leroy', 'Moreau']
+WORDS = ['réunion', 'budget', 'projet', 'salon', 'affiche', 'partenaire', 'planning', 'compte-rendu',
+         'trésorerie', 'événement', 'relance', 'facture', 'devis', 'atelier', 'bénévoles', 'stand']
+
+
+def insert_batches(model, rows, batch_size):
+    # INSERT multi-lignes via executemany, un commit par lot
+    table = model.__table__
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        total += len(batch)
+    return total
+
+
+def ids_for(column, prefix):
+    return [row[0] for row in db.session.query(column.class_.id).filter(column.like(f"{prefix}%")).order_by(column.class_.id)]
+
+
+def sentence(rng, words=8):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, words))).capitalize() + '.'
+
+
+def ensure_ranks():
+    ranks = {r.name: r.id for r in Rank.query.all()}
+    for name, level in (('admin', 10), ('membre', 1)):
+        if name not in ranks:
+            rank = Rank(name=name, level=level)
+            db.session.add(rank)
+            db.session.flush()
+            ranks[name] = rank.id
+    db.session.commit()
+    return ranks
+
+
+def mind_map_document(rng, title, nodes):
+    children = [
+        {"id": f"n{i}", "topic": sentence(rng, 4), "children": []}
+        for i in range(nodes)
+    ]
+    return json.dumps({
+        "nodeData": {"id": "root", "topic": title, "children": children, "root": True},
+        "linkData": {}, "noteData": {}, "expand": {}
+    })
+
+
+def seed(args):
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    step = time.perf_counter()
+
+    def report(label, count):
+        nonlocal step
+        elapsed = time.perf_counter() - step
+        print(f"✅ {label:<14} {count:>9}  ({elapsed:6.1f} s, {count / max(elapsed, 1e-9):9.0f}/s)")
+        step = time.perf_counter()
+
+    ranks = ensure_ranks()
+    password_hash = bcrypt.generate_password_hash(PASSWORD, args.bcrypt_rounds).decode('utf-8')
+
+    def users():
+        yield dict(username=f"{args.prefix}_admin", password_hash=password_hash, first_name='Admin',
+                   last_name='Charge', email=f"{args.prefix}_admin@example.test", rank_id=ranks['admin'],
+                   language='fr', theme='light', created_at=now, updated_at=now)
+        for i in range(args.users):
+            yield dict(username=f"{args.prefix}_u{i}", password_hash=password_hash,
+                       first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                       email=f"{args.prefix}_u{i}@example.test", age=rng.randint(18, 70),
+                       rank_id=ranks['membre'], language='fr', theme='light', created_at=now, updated_at=now)
+
+    report('utilisateurs', insert_batches(User, users(), args.batch))
+    admin_id = db.session.query(User.id).filter_by(username=f"{args.prefix}_admin").scalar()
+    user_ids = ids_for(User.username, f"{args.prefix}_u")
+
+    def groups():
+        for i in range(args.groups):
+            yield dict(name=f"{args.prefix} projet {i}", description=sentence(rng, 16),
+                       created_by=admin_id, created_at=now)
+
+    report('projets', insert_batches(Group, groups(), args.batch))
+    group_ids = ids_for(Group.name, f"{args.prefix} projet ")
+
+    # Rôles : un chef, un trésorier, quelques messagers, le reste membres
+    members_by_group = {}
+
+    def memberships():
+        for group_id in group_ids:
+            members = rng.sample(user_ids, min(args.members_per_group, len(user_ids)))
+            members_by_group[group_id] = members
+            for index, user_id in enumerate(members):
+                role = 'chef' if index == 0 else 'trésorier' if index == 1 else 'messager' if index < 5 else 'membre'
+                yield dict(user_id=user_id, group_id=group_id, role_in_group=role, joined_at=now)
+            # L'admin est chef du premier projet (scénarios mind map du benchmark)
+            if group_id == group_ids[0]:
+                yield dict(user_id=admin_id, group_id=group_id, role_in_group='chef', joined_at=now)
+
+    report('adhésions', insert_batches(GroupMembership, memberships(), args.batch))
+
+    def discussions():
+        for group_id in group_ids:
+            messagers = members_by_group[group_id][2:5] or members_by_group[group_id] or [admin_id]
+            for i in range(args.discussions_per_group):
+                yield dict(group_id=group_id, title=f"Discussion {i} — {sentence(rng, 4)}",
+                           created_by=rng.choice(messagers), admin_id=admin_id, created_at=now)
+
+    report('discussions', insert_batches(Discussion, discussions(), args.batch))
+    discussions_rows = db.session.query(Discussion.id, Discussion.group_id, Discussion.created_by) \
+        .filter(Discussion.group_id.in_(group_ids)).all() if group_ids else []
+
+    def messages():
+        if not discussions_rows:
+            return
+        start = now - timedelta(seconds=args.messages)
+        for i in range(args.messages):
+            # Distribution biaisée : quelques discussions très actives
+            d = discussions_rows[min(int(rng.paretovariate(1.2)) - 1, len(discussions_rows) - 1)] \
+                if rng.random() < 0.5 else rng.choice(discussions_rows)
+            yield dict(sender_id=rng.choice((d.created_by, admin_id)), group_id=d.group_id,
+                       discussion_id=d.id, content=sentence(rng, 20), sent_at=start + timedelta(seconds=i))
+
+    report('messages', insert_batches(Message, messages(), args.batch))
+
+    def mind_maps():
+        for group_id in group_ids[:args.mind_maps]:
+            yield dict(group_id=group_id, title="Carte Mentale", revision=0, snapshot_revision=0,
+                       data=mind_map_document(rng, f"{args.prefix} projet", args.mind_map_nodes), created_at=now)
+
+    report('cartes', insert_batches(MindMap, mind_maps(), args.batch))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--groups', type=int, default=100)
+    parser.add_argument('--members-per-group', type=int, default=20)
+    parser.add_argument('--discussions-per-group', type=int, default=3)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--mind-maps', type=int, default=100)
+    parser.add_argument('--mind-map-nodes', type=int, default=30)
+    parser.add_argument('--batch', type=int, default=5000)
+    parser.add_argument('--bcrypt-rounds', type=int, default=12)
+    parser.add_argument('--prefix', default='seed')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        seed(args)
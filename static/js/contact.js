@@ -0,0 +1,32 @@
+const quill = new Quill('#editor', {
+  theme: 'snow'
+});
+
+document.getElementById('contactForm').addEventListener('submit', function(e) {
+  e.preventDefault();
+  const email = document.getElementById('email').value;
+  const content = quill.root.innerHTML;
+
+  fetch('/contact/send', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json'
+    },
+    body: JSON.stringify({ email: email, message: content })
+  })
+  .then(res => {
+    if (res.ok) {
+      document.getElementById('successMsg').style.display = 'block';
+      document.getElementById('errorMsg').style.display = 'none';
+      document.getElementById('email').value = '';
+      quill.setContents([]);
+    } else {
+      document.getElementById('successMsg').style.display = 'none';
+      document.getElementById('errorMsg').style.display = 'block';
+    }
+  })
+  .catch(() => {
+    document.getElementById('successMsg').style.display = 'none';
+    document.getElementById('errorMsg').style.display = 'block';
+  });
+});
@@ -0,0 +1,306 @@
+feather.replace();
+
+function openModal() {
+  document.getElementById('modal').style.display = 'flex';
+}
+
+function closeModal() {
+  document.getElementById('modal').style.display = 'none';
+}
+
+let messageStream = null;
+let lastMessageId = 0;
+let renderedIds = new Set();
+
+let firstMessageId = null;
+// Réponses déjà reçues par URL : renvoyées avec If-None-Match, un 304 réutilise la copie locale
+const responseCache = new Map();
+
+function fetchJSON(url) {
+  const cached = responseCache.get(url);
+  return fetch(url, {
+    cache: "no-store",
+    headers: cached ? { "If-None-Match": cached.etag } : {}
+  }).then(res => {
+    if (res.status === 304 && cached) return cached.data;
+    return res.json().then(data => {
+      const etag = res.headers.get("ETag");
+      if (res.ok && etag) responseCache.set(url, { etag, data });
+      return data;
+    });
+  });
+}
+
+// Palette complète : les emojis sans réaction n'apparaissent qu'au survol
+function buildReactions(messageId, reactions) {
+  const bar = document.createElement("div");
+  bar.className = "message-reactions";
+  const byEmoji = new Map((reactions || []).map(r => [r.emoji, r]));
+
+  REACTIONS.forEach(emoji => {
+    const reaction = byEmoji.get(emoji);
+    const button = document.createElement("button");
+    button.type = "button";
+    button.className = "reaction";
+    button.classList.toggle("empty", !reaction);
+    button.classList.toggle("reacted", Boolean(reaction && reaction.reacted));
+    button.textContent = reaction ? `${emoji} ${reaction.count}` : emoji;
+    button.addEventListener("click", () => toggleReaction(messageId, emoji, Boolean(reaction && reaction.reacted)));
+    bar.appendChild(button);
+  });
+  return bar;
+}
+
+function toggleReaction(messageId, emoji, reacted) {
+  fetch(`/dashboard/message/${messageId}/${reacted ? "unreact" : "react"}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ emoji })
+  })
+  .then(res => res.ok ? res.json() : null)
+  .then(data => {
+    if (!data) return;
+    const bubble = document.querySelector(`.message-bubble[data-message-id="${data.message_id}"]`);
+    if (bubble) bubble.replaceChild(buildReactions(data.message_id, data.reactions), bubble.lastChild);
+  });
+}
+
+function formatSize(bytes) {
+  if (bytes >= 1024 * 1024) return `${(bytes / 1024 / 1024).toFixed(1)} Mo`;
+  return `${Math.max(1, Math.round(bytes / 1024))} Ko`;
+}
+
+function buildAttachments(files) {
+  const list = document.createElement("div");
+  list.className = "message-attachments";
+  (files || []).forEach(file => {
+    const link = document.createElement("a");
+    link.href = file.url;
+    link.textContent = `📎 ${file.name} (${formatSize(file.size)})`;
+    list.appendChild(link);
+  });
+  return list;
+}
+
+function buildBubble(msg) {
+  const div = document.createElement("div");
+  div.classList.add("message-bubble", msg.sender_id === CURRENT_USER_ID ? "from-me" : "from-them");
+  div.dataset.messageId = msg.id;
+  const text = document.createElement("span");
+  text.textContent = msg.content;
+  // Les réactions restent en dernier : toggleReaction remplace lastChild
+  div.append(text, buildAttachments(msg.attachments), buildReactions(msg.id, msg.reactions));
+  return div;
+}
+
+function renderMessage(msg) {
+  if (renderedIds.has(msg.id)) return;
+  renderedIds.add(msg.id);
+  lastMessageId = Math.max(lastMessageId, msg.id);
+  if (firstMessageId === null) firstMessageId = msg.id;
+
+  const container = document.querySelector(".discussion-messages");
+  container.appendChild(buildBubble(msg));
+  container.scrollTop = container.scrollHeight;
+}
+
+function setHasMore(hasMore) {
+  document.querySelector(".load-older-btn").hidden = !hasMore;
+}
+
+function loadOlder() {
+  const panel = document.getElementById("discussionPanel");
+  const discussionId = panel.getAttribute("data-discussion-id");
+  if (!discussionId || firstMessageId === null) return;
+
+  fetchJSON(`/dashboard/get-messages/${discussionId}?before_id=${firstMessageId}`)
+    .then(data => {
+      const container = panel.querySelector(".discussion-messages");
+      const previousHeight = container.scrollHeight;
+      const fragment = document.createDocumentFragment();
+
+      data.messages.forEach(msg => {
+        if (renderedIds.has(msg.id)) return;
+        renderedIds.add(msg.id);
+        fragment.appendChild(buildBubble(msg));
+      });
+      if (data.messages.length) firstMessageId = data.messages[0].id;
+
+      container.prepend(fragment);
+      // Garde la position de lecture après l'ajout en haut
+      container.scrollTop += container.scrollHeight - previousHeight;
+      setHasMore(data.has_more);
+    });
+}
+
+function closeStream() {
+  if (messageStream) {
+    messageStream.close();
+    messageStream = null;
+  }
+}
+
+function openStream(discussionId) {
+  closeStream();
+  // Le navigateur se reconnecte seul et renvoie Last-Event-ID
+  messageStream = new EventSource(`/dashboard/stream-messages/${discussionId}?last_id=${lastMessageId}`);
+  messageStream.onmessage = (event) => renderMessage(JSON.parse(event.data));
+}
+
+function openDiscussion(title, discussionId) {
+  const panel = document.getElementById("discussionPanel");
+  const titleElem = document.getElementById("discussionTitle");
+  const messagesContainer = panel.querySelector(".discussion-messages");
+  const textarea = panel.querySelector("textarea");
+
+  closeStream();
+  panel.classList.remove("no-discussion");
+  titleElem.textContent = title;
+  panel.setAttribute('data-discussion-id', discussionId);
+  messagesContainer.innerHTML = '';
+  textarea.value = '';
+  textarea.rows = 1;
+  lastMessageId = 0;
+  firstMessageId = null;
+  renderedIds = new Set();
+  setHasMore(false);
+
+  fetchJSON(`/dashboard/get-messages/${discussionId}`)
+    .then(data => {
+      data.messages.forEach(renderMessage);
+      setHasMore(data.has_more);
+      openStream(discussionId);
+    });
+}
+
+function closeDiscussion() {
+  const panel = document.getElementById("discussionPanel");
+  closeStream();
+  setHasMore(false);
+  panel.classList.add("no-discussion");
+  panel.removeAttribute("data-discussion-id");
+
+  panel.querySelector(".discussion-messages").innerHTML = '';
+  panel.querySelector("textarea").value = '';
+  panel.querySelector("textarea").rows = 1;
+  document.getElementById("discussionTitle").textContent = '';
+}
+
+const fileInput = document.querySelector(".attach-btn input");
+const attachmentQueue = document.querySelector(".attachment-queue");
+
+function showQueue(text) {
+  attachmentQueue.textContent = text;
+}
+
+fileInput.addEventListener("change", () => {
+  showQueue(Array.from(fileInput.files).map(f => `📎 ${f.name}`).join("  "));
+});
+
+function delay(ms) {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+// Envoi par morceaux : après une coupure, on redemande la position au serveur et on reprend
+async function uploadFile(file, discussionId) {
+  const start = await fetch("/dashboard/attachments/uploads", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      discussion_id: Number(discussionId),
+      name: file.name,
+      size: file.size,
+      content_type: file.type
+    })
+  }).then(res => res.json().then(data => {
+    if (!res.ok) throw new Error(data.error);
+    return data;
+  }));
+
+  const url = `/dashboard/attachments/uploads/${start.upload_id}`;
+  let offset = start.offset;
+  let failures = 0;
+
+  while (offset < file.size) {
+    const end = Math.min(offset + start.chunk_size, file.size);
+    showQueue(`Envoi de ${file.name} : ${Math.floor(offset * 100 / file.size)} %`);
+    try {
+      const res = await fetch(url, {
+        method: "PUT",
+        headers: { "Content-Range": `bytes ${offset}-${end - 1}/${file.size}` },
+        body: file.slice(offset, end)
+      });
+      const data = await res.json();
+      if (res.ok || res.status === 409) {
+        offset = data.offset;
+        failures = 0;
+        continue;
+      }
+      throw new Error(data.error);
+    } catch (error) {
+      if (++failures > 5) throw error;
+      await delay(1000 * failures);
+      const status = await fetch(url).then(res => res.json()).catch(() => null);
+      if (status && status.offset !== undefined) offset = status.offset;
+    }
+  }
+  return start.upload_id;
+}
+
+async function sendMessage() {
+  const panel = document.getElementById("discussionPanel");
+  const discussionId = panel.getAttribute("data-discussion-id");
+  const textarea = panel.querySelector("textarea");
+  const message = textarea.value.trim();
+  const files = Array.from(fileInput.files);
+
+  if (!message && !files.length) return;
+
+  let uploadIds = [];
+  try {
+    for (const file of files) {
+      uploadIds.push(await uploadFile(file, discussionId));
+    }
+  } catch (error) {
+    showQueue(`Échec de l'envoi : ${error.message}`);
+    return;
+  }
+
+  fetch("/dashboard/send-message", {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json"
+    },
+    body: JSON.stringify({
+      discussion_id: discussionId,
+      content: message,
+      attachments: uploadIds
+    })
+  })
+  .then(res => res.json())
+  .then(data => {
+    renderMessage(data);
+
+    textarea.value = "";
+    textarea.rows = 1;
+    fileInput.value = "";
+    showQueue("");
+  });
+}
+
+// Bouton "envoyer"
+document.querySelector(".discussion-input .send-btn").addEventListener("click", sendMessage);
+
+// Envoi avec Entrée, saut ligne avec Shift+Entrée
+document.querySelector(".discussion-input textarea").addEventListener("keydown", function (e) {
+  if (e.key === "Enter" && !e.shiftKey) {
+    e.preventDefault();
+    sendMessage();
+  }
+});
+
+// Auto-ajustement hauteur du textarea
+document.querySelector(".discussion-input textarea").addEventListener("input", function () {
+  this.rows = 1;
+  this.rows = Math.min(6, Math.floor(this.scrollHeight / 24));
+});
@@ -0,0 +1,130 @@
+document.addEventListener('DOMContentLoaded', () => {
+  console.log("[DEBUG] DOMContentLoaded déclenché");
+
+  const config = JSON.parse(document.getElementById('mind-map-config').textContent);
+  const mindData = config.data;
+  console.log("[DEBUG] Données mindData :", mindData);
+
+  const options = {
+    el: '#map',
+    direction: MindElixir.LEFT,
+    draggable: true,
+    contextMenu: true,
+    toolBar: true,
+    nodeMenu: true,
+    keypress: true
+  };
+
+  const mind = new MindElixir(options);
+
+  try {
+    mind.init(mindData);  // ⚠️ mindData doit contenir nodeData.root === true
+    console.log("[DEBUG] MindElixir initialisé !");
+  } catch (e) {
+    console.error("[ERREUR] lors de l'initialisation de MindElixir:", e);
+  }
+
+  // Révision de référence et dernier état enregistré, pour n'envoyer que le diff
+  let revision = config.revision;
+  let saved = flatten(mindData.nodeData);
+  let savedMeta = metaOf(mindData);
+
+  function flatten(root) {
+    const nodes = new Map();
+    (function walk(node, parent, index) {
+      const { children, parent: _parent, root: _root, ...fields } = node;
+      nodes.set(node.id, { parent, index, fields, json: JSON.stringify(fields) });
+      (children || []).forEach((child, i) => walk(child, node.id, i));
+    })(root, null, 0);
+    return nodes;
+  }
+
+  function metaOf(data) {
+    const { nodeData, ...meta } = data;
+    return JSON.stringify(meta);
+  }
+
+  function diff(before, after) {
+    const ops = [];
+    // Parcours préfixe : un parent est toujours ajouté avant ses enfants
+    after.forEach((node, id) => {
+      const old = before.get(id);
+      if (!old) {
+        ops.push({ op: 'add', parent: node.parent, index: node.index, ...node.fields });
+        return;
+      }
+      if (node.parent !== null && (old.parent !== node.parent || old.index !== node.index)) {
+        ops.push({ op: 'move', id, parent: node.parent, index: node.index });
+      }
+      if (old.json !== node.json) {
+        ops.push({ op: 'update', ...node.fields });
+      }
+    });
+    before.forEach((node, id) => {
+      if (!after.has(id)) ops.push({ op: 'delete', id });
+    });
+    return ops;
+  }
+
+  // Vérifie les enregistrements des autres éditeurs : 304 sans corps tant que rien n'a changé
+  let dataEtag = null;
+  function checkRemoteChanges() {
+    if (document.hidden) return;
+    fetch(config.dataUrl, {
+      cache: "no-store",
+      headers: dataEtag ? { "If-None-Match": dataEtag } : {}
+    })
+    .then(res => {
+      if (res.status !== 200) return;
+      dataEtag = res.headers.get("ETag");
+      return res.json().then(body => {
+        if (body.revision === revision) return;
+        const local = mind.getAllData();
+        // Modifications locales non enregistrées : on les garde, le conflit sera signalé à l'enregistrement
+        if (diff(saved, flatten(local.nodeData)).length || metaOf(local) !== savedMeta) return;
+        mind.refresh(body.data);
+        revision = body.revision;
+        saved = flatten(body.data.nodeData);
+        savedMeta = metaOf(body.data);
+      });
+    });
+  }
+  setInterval(checkRemoteChanges, 30000);
+
+  document.getElementById('save-map')?.addEventListener('click', () => {
+    const data = mind.getAllData();
+    const current = flatten(data.nodeData);
+    const ops = diff(saved, current);
+    const meta = metaOf(data);
+    if (meta !== savedMeta) {
+      const { nodeData, ...fields } = data;
+      ops.push({ op: 'meta', ...fields });
+    }
+
+    if (!ops.length) {
+      alert("Aucune modification à enregistrer.");
+      return;
+    }
+
+    fetch(config.patchUrl, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ revision, ops })
+    })
+    .then(res => res.json().then(body => ({ status: res.status, body })))
+    .then(({ status, body }) => {
+      if (body.success) {
+        revision = body.revision;
+        saved = current;
+        savedMeta = meta;
+        alert("Carte mentale enregistrée !");
+      } else if (status === 409) {
+        alert("La carte a été modifiée par quelqu'un d'autre. Rechargement…");
+        window.location.reload();
+      } else {
+        alert("Erreur lors de l'enregistrement.");
+        console.error("[ERREUR] Réponse serveur :", body);
+      }
+    });
+  });
+});
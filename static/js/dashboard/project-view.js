@@ -0,0 +1,43 @@
+feather.replace();
+// Candidats chargés à la demande, par pages, au lieu de toute la table users
+let candidateCursor = null;
+let searchTimer = null;
+
+function loadCandidates(reset) {
+    const select = document.getElementById('userSelect');
+    const params = new URLSearchParams({ q: document.getElementById('userSearch').value });
+    if (reset) {
+        candidateCursor = null;
+    } else if (candidateCursor) {
+        params.set('after', candidateCursor);
+    }
+
+    fetch(`${select.dataset.candidatesUrl}?${params}`)
+        .then(res => res.json())
+        .then(data => {
+            if (reset) select.innerHTML = '';
+            data.users.forEach(u => {
+                const option = document.createElement('option');
+                option.value = u.id;
+                option.textContent = `${u.name} (${u.username})`;
+                select.appendChild(option);
+            });
+            candidateCursor = data.next_cursor;
+            document.getElementById('moreUsers').hidden = !candidateCursor;
+        });
+}
+
+document.getElementById('userSearch').addEventListener('input', () => {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => loadCandidates(true), 250);
+});
+
+function openModal(role) {
+    document.getElementById('modalRole').value = role;
+    document.getElementById('addRoleModal').style.display = 'flex';
+    loadCandidates(true);
+}
+
+function closeModal() {
+    document.getElementById('addRoleModal').style.display = 'none';
+}
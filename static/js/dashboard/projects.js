@@ -0,0 +1,20 @@
+feather.replace();
+
+const searchInput = document.querySelector('.search-bar');
+const projectsGrid = document.querySelector('.projects-grid');
+const projectCards = projectsGrid.querySelectorAll('.project-card');
+
+searchInput.addEventListener('keyup', function() {
+  const searchTerm = searchInput.value.toLowerCase();
+
+  projectCards.forEach(card => {
+    const projectName = card.querySelector('h3').textContent.toLowerCase();
+    const projectDesc = card.querySelector('p').textContent.toLowerCase();
+
+    if (projectName.includes(searchTerm) || projectDesc.includes(searchTerm)) {
+      card.style.display = '';
+    } else {
+      card.style.display = 'none';
+    }
+  });
+});
@@ -0,0 +1,11 @@
+feather.replace();
+
+function previewProfilePicture(input) {
+  const preview = document.getElementById('profilePreview');
+  const file = input.files[0];
+  if (file) {
+    const reader = new FileReader();
+    reader.onload = e => preview.src = e.target.result;
+    reader.readAsDataURL(file);
+  }
+}
@@ -0,0 +1,95 @@
+# tests/conftest.py
+import pytest
+
+from app import create_app
+from routes.config import Config
+from routes.extensions import db, bcrypt, identity_cache, fragment_cache
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    # Même base que le développement (SQLite), dans un dossier temporaire
+    folder = tmp_path_factory.mktemp('app')
+
+    class TestConfig(Config):
+        TESTING = True
+        WTF_CSRF_ENABLED = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{folder / 'test.db'}"
+        LOG_FILE = str(folder / 'logs' / 'app.log')
+        PASSWORD_HASH_LOCK_DIR = str(folder / 'bcrypt-slots')
+        ATTACHMENT_FOLDER = str(folder / 'attachments')
+        REALTIME_BACKEND = 'memory'
+        RATELIMIT_ENABLED = False
+        BCRYPT_LOG_ROUNDS = 4
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        import migrations
+        db.create_all()
+        migrations.upgrade(db.engine)
+        seed(app)
+    return app
+
+
+def seed(app):
+    from routes.models import Rank, User, Group, GroupMembership, Discussion, Message, MessageReaction
+
+    admin = Rank(name='admin', level=10)
+    membre = Rank(name='membre', level=1)
+    db.session.add_all([admin, membre])
+    db.session.flush()
+
+    password_hash = bcrypt.generate_password_hash('secret1', 4).decode()
+    alice = User(username='alice', password_hash=password_hash, first_name='Alice', last_name='L', rank_id=admin.id)
+    bob = User(username='bob', password_hash=password_hash, first_name='Bob', last_name='O', rank_id=membre.id)
+    carol = User(username='carol', password_hash=password_hash, first_name='Carol', last_name='E', rank_id=membre.id)
+    db.session.add_all([alice, bob, carol])
+    db.session.flush()
+
+    for i in range(30):
+        group = Group(name=f"Projet {i}", description="Description", created_by=alice.id)
+        db.session.add(group)
+        db.session.flush()
+        db.session.add(GroupMembership(user_id=alice.id, group_id=group.id, role_in_group='chef'))
+        db.session.add(GroupMembership(user_id=bob.id, group_id=group.id, role_in_group='messager'))
+        discussion = Discussion(group_id=group.id, title=f"Discussion {i}", created_by=bob.id, admin_id=alice.id)
+        db.session.add(discussion)
+        db.session.flush()
+        db.session.add_all([
+            Message(sender_id=(alice.id, bob.id)[n % 2], group_id=group.id, discussion_id=discussion.id, content=f"m{n}")
+            for n in range(60)
+        ])
+    db.session.add(GroupMembership(user_id=carol.id, group_id=1, role_in_group='membre'))
+    db.session.flush()
+
+    # Réactions sur les derniers messages de la première discussion
+    for message in Message.query.filter_by(discussion_id=1).order_by(Message.id.desc()).limit(20):
+        db.session.add(MessageReaction(user_id=alice.id, message_id=message.id, emoji='👍'))
+        db.session.add(MessageReaction(user_id=bob.id, message_id=message.id, emoji='🎉'))
+    db.session.commit()
+
+
+@pytest.fixture
+def client(app):
+    identity_cache.clear()
+    fragment_cache.clear()
+    return app.test_client()
+
+
+def login(client, username):
+    response = client.post('/login', data={'username': username, 'password': 'secret1'})
+    assert response.status_code == 302
+    # Première page : session et cache d'identité chargés, les comptes suivants ne portent que sur la page
+    assert client.get('/dashboard/projects').status_code == 200
+    return client
+
+
+@pytest.fixture
+def alice(client):
+    return login(client, 'alice')
+
+
+@pytest.fixture
+def carol(client):
+    # Simple membre du projet 1 : ni créatrice ni administratrice de sa discussion
+    return login(client, 'carol')
@@ -0,0 +1,31 @@
+# tests/test_assets.py
+# Repli CDN des bibliothèques non construites : hash SRI tiré de vendor.lock.json
+import base64
+import hashlib
+
+from routes.assets import VENDOR
+from routes.extensions import assets
+
+
+def test_cdn_fallback_integrity(app, monkeypatch):
+    digest = hashlib.sha256(b'feather').hexdigest()
+    monkeypatch.setattr(assets, 'manifest', {})
+    monkeypatch.setattr(assets, 'lock', {
+        'vendor/feather.min.js': {'url': VENDOR['vendor/feather.min.js'], 'sha256': digest},
+        'vendor/quill.min.js': {'url': 'https://cdn.example/ancienne-version.js', 'sha256': digest},
+        'vendor/fonts/inter.css': {'url': VENDOR['vendor/fonts/inter.css'], 'sha256': digest},
+    })
+    expected = base64.b64encode(bytes.fromhex(digest)).decode()
+    assert assets.integrity('vendor/feather.min.js') == f' integrity="sha256-{expected}" crossorigin="anonymous"'
+    # URL changée sans --update-lock, feuille de polices variable, fichier absent du verrou
+    assert assets.integrity('vendor/quill.min.js') == ''
+    assert assets.integrity('vendor/fonts/inter.css') == ''
+    assert assets.integrity('vendor/polyfill.min.js') == ''
+
+
+def test_built_files_have_no_integrity(app, monkeypatch):
+    monkeypatch.setattr(assets, 'manifest', {'vendor/feather.min.js': 'dist/vendor/feather.min.0123456789.js'})
+    monkeypatch.setattr(assets, 'lock', {
+        'vendor/feather.min.js': {'url': VENDOR['vendor/feather.min.js'], 'sha256': '00' * 32},
+    })
+    assert assets.integrity('vendor/feather.min.js') == ''
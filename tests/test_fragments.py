@@ -0,0 +1,14 @@
+# tests/test_fragments.py
+# Barre latérale en cache : une modification faite par un autre worker doit s'afficher aussitôt
+from .test_identity import update_elsewhere
+
+
+def test_sidebar_follows_profile_changes(app, alice):
+    assert b'avatar-placeholder' in alice.get('/dashboard/projects').data
+    try:
+        update_elsewhere(app, 'alice', profile_picture_url='0123456789abcdef_1')
+        page = alice.get('/dashboard/projects').data
+        assert b'avatar-placeholder' not in page
+        assert b'0123456789abcdef_1' in page
+    finally:
+        update_elsewhere(app, 'alice', profile_picture_url=None)
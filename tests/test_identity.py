@@ -0,0 +1,38 @@
+# tests/test_identity.py
+# Le cache d'identité est local au worker : un changement fait ailleurs doit quand même s'appliquer
+from datetime import datetime
+
+from routes.extensions import db, identity_cache
+from routes.models import User, Rank
+
+
+def update_elsewhere(app, username, **values):
+    # Écriture directe en base, sans invalider le cache de ce processus (comme un autre worker)
+    with app.app_context():
+        values['updated_at'] = datetime.utcnow()
+        User.query.filter_by(username=username).update(values, synchronize_session=False)
+        db.session.commit()
+
+
+def rank_id(app, name):
+    with app.app_context():
+        return Rank.query.filter_by(name=name).one().id
+
+
+def test_demoted_admin_loses_access(app, alice):
+    assert alice.get('/dashboard/members').status_code == 200
+    try:
+        update_elsewhere(app, 'alice', rank_id=rank_id(app, 'membre'))
+        assert alice.get('/dashboard/members').status_code == 302
+    finally:
+        update_elsewhere(app, 'alice', rank_id=rank_id(app, 'admin'))
+    assert alice.get('/dashboard/members').status_code == 200
+
+
+def test_password_hash_not_cached(app, alice):
+    with app.app_context():
+        user_id = User.query.filter_by(username='alice').one().id
+        identity_cache.load(user_id)
+        assert 'password_hash' not in identity_cache._get(user_id)['columns']
+        # Rechargé à la demande quand le mot de passe doit être vérifié
+        assert identity_cache.load(user_id).password_hash.startswith('$2')
@@ -0,0 +1,54 @@
+# tests/test_query_counts.py
+# Nombre de requêtes SQL par page : une régression N+1 fait échouer le test.
+# Chaque compte inclut la relecture de la version de l'utilisateur par le cache d'identité
+from routes.extensions import fragment_cache
+from routes.querycount import assert_num_queries
+
+
+def test_get_messages(app, alice):
+    # Discussion et dernier id, messages, réactions, pièces jointes : quel que soit le nombre de messages
+    for limit in (5, 50):
+        with app.app_context(), assert_num_queries(5):
+            response = alice.get(f'/dashboard/get-messages/1?limit={limit}')
+        assert response.status_code == 200
+        assert len(response.get_json()['messages']) == limit
+
+
+def test_get_messages_older_page(app, alice):
+    newest = alice.get('/dashboard/get-messages/1?limit=10').get_json()['messages'][0]['id']
+    with app.app_context(), assert_num_queries(5):
+        response = alice.get(f'/dashboard/get-messages/1?before_id={newest}&limit=10')
+    assert response.status_code == 200
+    assert response.get_json()['messages'][-1]['id'] < newest
+
+
+def test_get_messages_member_check(app, carol):
+    # L'appartenance au projet est vérifiée en base (une requête EXISTS de plus)
+    with app.app_context(), assert_num_queries(6):
+        response = carol.get('/dashboard/get-messages/1')
+    assert response.status_code == 200
+
+
+def test_get_messages_not_modified(app, alice):
+    etag = alice.get('/dashboard/get-messages/1').headers['ETag']
+    with app.app_context(), assert_num_queries(2):
+        response = alice.get('/dashboard/get-messages/1', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_project_view(app, alice):
+    # Projet, puis membres avec leur utilisateur en une jointure
+    alice.get('/dashboard/project/1')
+    fragment_cache.clear()
+    with app.app_context(), assert_num_queries(3):
+        response = alice.get('/dashboard/project/1')
+    assert response.status_code == 200
+
+
+def test_projects(app, alice):
+    # Une seule requête pour toutes les cartes (compteurs en sous-requêtes), page pleine ou non
+    for url in ('/dashboard/projects', '/dashboard/projects?after=24'):
+        fragment_cache.clear()
+        with app.app_context(), assert_num_queries(2):
+            response = alice.get(url)
+        assert response.status_code == 200
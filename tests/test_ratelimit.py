@@ -0,0 +1,32 @@
+# tests/test_ratelimit.py
+# Le seau par identifiant ne se vide que sur des échecs : un tiers ne bloque pas un compte au hasard
+import pytest
+
+from routes.extensions import rate_limiter
+from routes.ratelimit import MemoryBucketStore, parse_limit
+
+
+@pytest.fixture
+def limiter(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'RATELIMIT_ENABLED', True)
+    monkeypatch.setattr(rate_limiter, 'store', MemoryBucketStore())
+    monkeypatch.setattr(rate_limiter, 'login_failures', [parse_limit('3/hour')])
+    return rate_limiter
+
+
+def post_login(app, password, ip):
+    return app.test_client().post('/login', data={'username': 'carol', 'password': password},
+                                  environ_base={'REMOTE_ADDR': ip})
+
+
+def test_successful_logins_do_not_charge_username(app, limiter):
+    for n in range(5):
+        assert post_login(app, 'secret1', f"10.0.0.{n}").status_code == 302
+
+
+def test_failures_lock_username_across_ips(app, limiter):
+    for n in range(3):
+        assert post_login(app, 'mauvais', f"10.0.1.{n}").status_code == 200
+    response = post_login(app, 'secret1', '10.0.1.99')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
@@ -0,0 +1,55 @@
+# tests/test_realtime.py
+# Flux SSE : nombre de flux borné par worker, rattrapage relu en base à chaque reconnexion
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from routes.extensions import db, hub
+from routes.models import Message
+
+
+def received(response):
+    return [json.loads(line[len('data: '):])['id'] for line in response.get_data(as_text=True).splitlines()
+            if line.startswith('data: ')]
+
+
+@pytest.fixture
+def quiet_discussion(app):
+    # Discussion 2 sans message récent, puis un message tout juste validé
+    with app.app_context():
+        Message.query.filter_by(discussion_id=2).update(
+            {'sent_at': datetime.utcnow() - timedelta(hours=1)}, synchronize_session=False)
+        message = Message(sender_id=2, group_id=2, discussion_id=2, content="validé en retard")
+        db.session.add(message)
+        db.session.commit()
+        yield message.id
+        db.session.delete(message)
+        db.session.commit()
+
+
+def test_polling_when_no_stream_slot(app, alice, monkeypatch):
+    monkeypatch.setattr(hub, '_streams', None)
+    response = alice.get('/dashboard/stream-messages/2', headers={'Last-Event-ID': '0'})
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).startswith(f"retry: {app.config['REALTIME_POLL_INTERVAL'] * 1000}\n\n")
+    assert len(received(response)) == 60
+
+
+def test_late_commit_is_resent_below_last_event_id(app, alice, monkeypatch, quiet_discussion):
+    monkeypatch.setattr(hub, '_streams', None)
+    # Le client a déjà reçu un id supérieur : le message récent est renvoyé quand même
+    response = alice.get('/dashboard/stream-messages/2', headers={'Last-Event-ID': str(quiet_discussion + 5)})
+    assert received(response) == [quiet_discussion]
+
+
+def test_stream_slot_released(app, alice, monkeypatch, quiet_discussion):
+    monkeypatch.setitem(app.config, 'REALTIME_STREAM_LIFETIME', 0)
+    monkeypatch.setattr(hub, '_streams', threading.BoundedSemaphore(1))
+    response = alice.get('/dashboard/stream-messages/2', headers={'Last-Event-ID': str(quiet_discussion - 1)})
+    assert response.get_data(as_text=True).startswith("retry: 3000\n\n")
+    assert received(response) == [quiet_discussion]
+    response.close()
+    assert hub.acquire_stream()
+    hub.release_stream()